@@ -0,0 +1,157 @@
+"""
+Read throughput of an SQLite file database while writes are under way.
+
+Runs the same workload against two copies of the catalog: one opened
+with SQLite's defaults and sessions sharing a single pool, one with the
+SQLite profile of ``madrproject.config.sqlite`` (WAL, tuned pragmas)
+and ``RoutingSession`` sending writes to the single writer connection.
+Reader threads look books up by id while writer threads rename books,
+each operation in its own session, as a request would. Run with::
+
+    python -m benchmarks.sqlite [--readers N] [--writers N] [--duration S]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALGORITHM', 'HS256')
+os.environ.setdefault('ACCESS_TOKEN_EXPIRES_MINUTES', '30')
+os.environ.setdefault('DATABASE_ECHO', 'false')
+
+from sqlalchemy import create_engine, update  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from madrproject import Books, Novelist  # noqa: E402
+from madrproject.config.database import (  # noqa: E402
+    RoutingSession,
+    create_writer_engine,
+    metadata,
+    pool_options,
+)
+from madrproject.config.sqlite import install_sqlite_profile  # noqa: E402
+from madrproject.config.statements import BOOK_BY_ID  # noqa: E402
+
+BOOKS = 1_000
+
+
+def seed(engine) -> None:
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        novelist = Novelist(name='novelist')
+        novelist.books = [
+            Books(year=1900, title=f'book {n}', novelist_id=None)
+            for n in range(BOOKS)
+        ]
+        session.add(novelist)
+        session.commit()
+
+
+def default_profile(url: str):
+    engine = create_engine(url, **pool_options(url))
+    seed(engine)
+    return lambda: Session(engine)
+
+
+def sqlite_profile(url: str):
+    reader = create_engine(url, **pool_options(url))
+    writer = create_writer_engine(url)
+    install_sqlite_profile(reader)
+    install_sqlite_profile(writer)
+    seed(writer)
+    return lambda: RoutingSession(reader, writer)
+
+
+def read(new_session) -> None:
+    with new_session() as session:
+        session.scalar(BOOK_BY_ID, {'book_id': random.randint(1, BOOKS)})
+
+
+def write(new_session) -> None:
+    with new_session() as session:
+        session.execute(
+            update(Books)
+            .where(Books.id == random.randint(1, BOOKS))
+            .values(title=f'book {time.perf_counter_ns()}')
+        )
+        session.commit()
+
+
+def worker(operation, new_session, deadline: float, counts: dict) -> None:
+    done = failed = 0
+    while time.monotonic() < deadline:
+        try:
+            operation(new_session)
+            done += 1
+        except OperationalError:
+            failed += 1
+
+    with counts['lock']:
+        counts[operation.__name__] += done
+        counts[f'{operation.__name__} errors'] += failed
+
+
+def measure(new_session, readers: int, writers: int, duration: float):
+    counts = {
+        'lock': threading.Lock(),
+        'read': 0,
+        'read errors': 0,
+        'write': 0,
+        'write errors': 0,
+    }
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=worker, args=(read, new_session, deadline, counts)
+        )
+        for _ in range(readers)
+    ] + [
+        threading.Thread(
+            target=worker, args=(write, new_session, deadline, counts)
+        )
+        for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5)
+    args = parser.parse_args()
+
+    print('| profile | reads/s | writes/s | read errors | write errors |')
+    print('|---|---|---|---|---|')
+
+    with tempfile.TemporaryDirectory() as directory:
+        profiles = {
+            'defaults': default_profile,
+            'sqlite profile': sqlite_profile,
+        }
+        for name, profile in profiles.items():
+            new_session = profile(f'sqlite:///{directory}/{name}.db')
+            counts = measure(
+                new_session, args.readers, args.writers, args.duration
+            )
+            print(
+                f'| {name} '
+                f'| {counts["read"] / args.duration:,.0f} '
+                f'| {counts["write"] / args.duration:,.0f} '
+                f'| {counts["read errors"]} '
+                f'| {counts["write errors"]} |'
+            )
+
+
+if __name__ == '__main__':
+    main()
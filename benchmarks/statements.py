@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of the hot lookups against an in-memory SQLite database.
+
+Compares building the statement on every call, the legacy
+``session.query`` form and the prebuilt statements of
+``madrproject.config.statements``. Run with::
+
+    python -m benchmarks.statements
+"""
+
+import os
+import timeit
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('ALGORITHM', 'HS256')
+os.environ.setdefault('ACCESS_TOKEN_EXPIRES_MINUTES', '30')
+
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from madrproject import Books, Novelist  # noqa: E402
+from madrproject.config.database import metadata  # noqa: E402
+from madrproject.config.statements import BOOK_BY_TITLE  # noqa: E402
+
+ROUNDS = 5
+CALLS = 2_000
+
+
+def main():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+
+    with Session(engine) as session:
+        novelist = Novelist(name='novelist')
+        novelist.books = [
+            Books(year=1900, title=f'book {n}', novelist_id=None)
+            for n in range(100)
+        ]
+        session.add(novelist)
+        session.commit()
+
+        variants = {
+            'select per call': lambda: session.scalar(
+                select(Books).where(Books.title == 'book 50').limit(1)
+            ),
+            'session.query': lambda: (
+                session.query(Books).filter(Books.title == 'book 50').first()
+            ),
+            'prebuilt': lambda: session.scalar(
+                BOOK_BY_TITLE, {'title': 'book 50'}
+            ),
+        }
+
+        for name, lookup in variants.items():
+            best = min(timeit.repeat(lookup, number=CALLS, repeat=ROUNDS))
+            print(f'{name:>16}: {best / CALLS * 1e6:7.1f} us per lookup')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Throughput of the production server from 1 to N workers.
+
+For each worker count, starts ``python -m madrproject.server`` on a
+scratch SQLite database and drives it with client processes issuing
+keep-alive requests for a fixed duration. Run with::
+
+    python -m benchmarks.workers [--max-workers N] [--duration S]
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROUTES = ('/', '/account/')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/')
+            if connection.getresponse().status == http.HTTPStatus.OK:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('server did not start')
+
+
+def client(port: int, route: str, duration: float, results) -> None:
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    done = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        connection.request('GET', route)
+        response = connection.getresponse()
+        response.read()
+        if response.status == http.HTTPStatus.OK:
+            done += 1
+    results.put(done)
+
+
+def measure(port: int, route: str, clients: int, duration: float) -> float:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=client, args=(port, route, duration, results)
+        )
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    total = sum(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return total / duration
+
+
+def create_database(env: dict) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'from madrproject import *\n'
+            'from madrproject.config.database import engine, metadata\n'
+            'metadata.create_all(engine)',
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--clients-per-worker', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            'DATABASE_URL': f'sqlite:///{directory}/bench.db',
+            'DATABASE_ECHO': 'false',
+            'SECRET_KEY': os.environ.get('SECRET_KEY', 'benchmark'),
+            'ALGORITHM': os.environ.get('ALGORITHM', 'HS256'),
+            'ACCESS_TOKEN_EXPIRES_MINUTES': '30',
+            'WEB_HOST': '127.0.0.1',
+        }
+        create_database(env)
+
+        print('| workers | ' + ' | '.join(f'{r} req/s' for r in ROUTES) + ' |')
+        print('|---|' + '---|' * len(ROUTES))
+
+        for workers in range(1, args.max_workers + 1):
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'madrproject.server'],
+                env={
+                    **env,
+                    'WEB_PORT': str(port),
+                    'WEB_WORKERS': str(workers),
+                },
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_until_ready(port)
+                rates = [
+                    measure(
+                        port,
+                        route,
+                        workers * args.clients_per_worker,
+                        args.duration,
+                    )
+                    for route in ROUTES
+                ]
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait()
+
+            print(
+                f'| {workers} | '
+                + ' | '.join(f'{rate:,.0f}' for rate in rates)
+                + ' |'
+            )
+
+
+if __name__ == '__main__':
+    main()
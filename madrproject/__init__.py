@@ -1,3 +1,10 @@
 from madrproject.accounts.models import Account as Account
+from madrproject.audit.models import AuditEvent as AuditEvent
+from madrproject.auth.models import RevokedToken as RevokedToken
 from madrproject.books.models import Books as Books
+from madrproject.changes.models import ChangeSequence as ChangeSequence
+from madrproject.changes.models import Tombstone as Tombstone
+from madrproject.idempotency.models import (
+    IdempotencyRecord as IdempotencyRecord,
+)
 from madrproject.novelists.models import Novelist as Novelist
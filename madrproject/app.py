@@ -1,17 +1,161 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from functools import partial
+
+from anyio import to_thread
+from fastapi import Depends, FastAPI
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
 
 from madrproject.accounts.routers import router as account_router
+from madrproject.audit.log import audit_log
+from madrproject.auth.ratelimit import prune_login_buckets
+from madrproject.auth.revocation import purge_revoked_tokens, revocations
 from madrproject.auth.routers import router as auth_router
+from madrproject.batch.routers import router as batch_router
 from madrproject.books.routers import router as books_router
+from madrproject.config.admission import (
+    AdmissionMiddleware,
+    threadpool_tokens,
+)
+from madrproject.config.autocomplete import catch_up_indexes, load_indexes
+from madrproject.config.compression import CompressionMiddleware
+from madrproject.config.database import engine, writer_engine
+from madrproject.config.maintenance import maintenance
+from madrproject.config.metrics import metrics
+from madrproject.config.profiling import (
+    ProfilingMiddleware,
+    instrument_engine,
+    instrument_routes,
+)
+from madrproject.config.security import require_metrics_token
+from madrproject.config.settings import settings
+from madrproject.config.timeouts import (
+    operational_error_handler,
+    pool_timeout_handler,
+)
+from madrproject.health.checks import precompile_statements, warm_pool
+from madrproject.health.routers import readiness
+from madrproject.health.routers import router as health_router
+from madrproject.idempotency.middleware import IdempotencyMiddleware
+from madrproject.idempotency.store import DatabaseStore, MemoryStore
 from madrproject.novelists.routers import router as novelists_router
 
-app = FastAPI()
+
+def warm_up():
+    warm_pool(engine, settings.WARM_UP_CONNECTIONS)
+    precompile_statements(engine)
+    load_indexes(engine)
+    with Session(engine) as session:
+        revocations.load(session)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = threadpool_tokens()
+
+    if settings.WARM_UP_ON_STARTUP:
+        await to_thread.run_sync(warm_up)
+    audit_log.start(writer_engine)
+    maintenance.start()
+    readiness.mark_started()
+    yield
+    await to_thread.run_sync(maintenance.stop)
+    await to_thread.run_sync(audit_log.stop)
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router=account_router)
 app.include_router(router=auth_router)
 app.include_router(router=books_router)
 app.include_router(router=novelists_router)
+app.include_router(router=batch_router)
+app.include_router(router=health_router)
+app.add_exception_handler(OperationalError, operational_error_handler)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+maintenance.register(
+    'rate_limit_buckets',
+    settings.LOGIN_RATE_LIMIT_PRUNE_INTERVAL_SECONDS,
+    prune_login_buckets,
+)
+maintenance.register(
+    'revoked_tokens',
+    settings.REVOCATION_PURGE_INTERVAL_SECONDS,
+    partial(purge_revoked_tokens, writer_engine),
+)
+maintenance.register(
+    'autocomplete',
+    settings.AUTOCOMPLETE_REFRESH_SECONDS,
+    partial(catch_up_indexes, engine),
+)
+
+if settings.IDEMPOTENCY_BACKEND == 'database':
+    idempotency_store = DatabaseStore(
+        writer_engine,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        lease=settings.IDEMPOTENCY_LEASE_SECONDS,
+    )
+    maintenance.register(
+        'idempotency_keys',
+        settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS,
+        idempotency_store.purge_expired,
+    )
+else:
+    idempotency_store = MemoryStore(
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    )
+
+app.add_middleware(
+    IdempotencyMiddleware,
+    store=idempotency_store,
+    paths={'/account/', '/book/', '/novelist/', '/batch/'},
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    offload_size=settings.COMPRESSION_OFFLOAD_SIZE,
+    excluded_paths={
+        '/auth/token/',
+        '/auth/refresh_token/',
+        '/auth/logout/',
+        '/health/live',
+        '/health/ready',
+    },
+)
+
+app.add_middleware(
+    AdmissionMiddleware,
+    max_concurrency=threadpool_tokens(),
+    max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+    exempt_paths={'/metrics', '/health/live', '/health/ready'},
+)
 
 
 @app.get('/')
 def read_root():
     return {'message': 'Olá Mundo'}
+
+
+@app.get(
+    '/metrics',
+    dependencies=[Depends(require_metrics_token)],
+    include_in_schema=False,
+)
+def read_metrics():
+    return metrics.snapshot()
+
+
+if settings.PROFILING_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(writer_engine)
+    instrument_routes(app)
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=settings.PROFILING_TOKEN,
+        output_dir=settings.PROFILING_OUTPUT_DIR,
+        interval_ms=settings.PROFILING_INTERVAL_MS,
+    )
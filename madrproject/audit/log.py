@@ -0,0 +1,258 @@
+"""
+Asynchronous audit trail of catalog and account changes.
+
+Request sessions (``RoutingSession``) collect the books, novelists and
+accounts they create, update or delete, with the account that made the
+change and the fields that changed, as ``{field: [old, new]}``. When the
+session commits, the events are put on a bounded in-process queue, so a
+write pays for a few dictionaries rather than an extra INSERT; changes
+that are rolled back are never audited.
+
+A background thread drains the queue and writes the events with one
+multi-row INSERT per batch, once ``batch_size`` events are waiting or
+``flush_interval`` seconds after the oldest one was queued. When the
+queue is full, a committing request waits up to ``enqueue_timeout`` for
+room, then drops its events and counts them in ``audit_events_total``.
+Stopping the writer first writes every event queued before it.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from madrproject.accounts.models import Account
+from madrproject.audit.models import AuditEvent
+from madrproject.books.models import Books
+from madrproject.config.database import RoutingSession, utcnow
+from madrproject.config.metrics import metrics
+from madrproject.config.settings import settings
+from madrproject.novelists.models import Novelist
+
+logger = logging.getLogger('madrproject.audit')
+
+ACTOR_KEY = 'audit_actor_id'
+PENDING_KEY = 'audit_pending'
+
+# Entity name and audited fields of each model; passwords are never
+# copied into the trail.
+AUDITED = {
+    Books: ('book', ('title', 'year', 'novelist_id')),
+    Novelist: ('novelist', ('name',)),
+    Account: ('account', ('username', 'email')),
+}
+
+_STOP = object()
+
+
+class AuditLog:
+    """
+    Bounded queue of audit events and the thread writing them.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.engine: Engine | None = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._thread: threading.Thread | None = None
+
+    def stats(self) -> dict:
+        return {
+            'running': self._thread is not None,
+            'queued': self._queue.qsize(),
+            'capacity': self._queue.maxsize,
+        }
+
+    def start(self, engine: Engine) -> None:
+        """
+        Starts the background writer, typically at application startup.
+
+        Args:
+            engine (Engine): Engine the events are written to.
+        """
+        self.engine = engine
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, name='audit-writer', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Writes every queued event, then stops the background writer.
+        """
+        if self._thread is None:
+            return
+
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def flush(self) -> None:
+        """
+        Waits until the running writer has handled every queued event.
+        """
+        self._queue.join()
+
+    def put(self, events: list[dict]) -> None:
+        """
+        Queues events for writing, waiting for room when the queue is
+        full.
+
+        Args:
+            events (list[dict]): Rows of the ``audit_events`` table.
+        """
+        deadline = time.monotonic() + self.enqueue_timeout
+
+        for index, audit_event in enumerate(events):
+            try:
+                self._queue.put(
+                    audit_event,
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+            except queue.Full:
+                dropped = len(events) - index
+                metrics.increment(
+                    'audit_events_total', dropped, outcome='dropped'
+                )
+                logger.warning(
+                    'Audit queue is full, dropped %s events', dropped
+                )
+                return
+
+    def _next_batch(self) -> tuple[list[dict], bool]:
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        batch = []
+
+        while True:
+            if item is _STOP:
+                self._queue.task_done()
+                return batch, True
+
+            batch.append(item)
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                return batch, False
+
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+
+    def _write(self, batch: list[dict]) -> None:
+        try:
+            with Session(self.engine) as session:
+                session.execute(insert(AuditEvent), batch)
+                session.commit()
+        except SQLAlchemyError:
+            metrics.increment(
+                'audit_events_total', len(batch), outcome='failed'
+            )
+            logger.exception('Could not write %s audit events', len(batch))
+        else:
+            metrics.increment(
+                'audit_events_total', len(batch), outcome='written'
+            )
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write(batch)
+
+
+audit_log = AuditLog(
+    max_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS,
+)
+metrics.register_collector('audit', audit_log.stats)
+
+
+def set_actor(session: Session, account_id: int) -> None:
+    """
+    Attributes the changes the session commits to an account.
+
+    Args:
+        session (Session): Session of the current request.
+        account_id (int): ID of the authenticated account.
+    """
+    session.info[ACTOR_KEY] = account_id
+
+
+def _changes(instance, fields: tuple[str, ...], action: str) -> dict:
+    if action == 'create':
+        return {field: [None, getattr(instance, field)] for field in fields}
+    if action == 'delete':
+        return {field: [getattr(instance, field), None] for field in fields}
+
+    attributes = inspect(instance).attrs
+    changes = {}
+    for field in fields:
+        history = attributes[field].history
+        if history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            changes[field] = [old, getattr(instance, field)]
+    return changes
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _collect_events(session, flush_context):
+    pending = session.info.setdefault(PENDING_KEY, [])
+    actor_id = session.info.get(ACTOR_KEY)
+    occurred_at = utcnow()
+
+    for action, instances in (
+        ('create', session.new),
+        ('update', session.dirty),
+        ('delete', session.deleted),
+    ):
+        for instance in instances:
+            audited = AUDITED.get(type(instance))
+            if audited is None:
+                continue
+
+            entity, fields = audited
+            changes = _changes(instance, fields, action)
+            if changes:
+                pending.append({
+                    'occurred_at': occurred_at,
+                    'actor_id': actor_id,
+                    'action': action,
+                    'entity': entity,
+                    'entity_id': instance.id,
+                    'changes': changes,
+                })
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _queue_events(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        audit_log.put(pending)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_events(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from madrproject.config.database import mapper_registry
+
+
+@mapper_registry.mapped_as_dataclass
+class AuditEvent:
+    __tablename__ = 'audit_events'
+    __table_args__ = (
+        Index('ix_audit_events_entity_entity_id', 'entity', 'entity_id'),
+    )
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(index=True)
+    actor_id: Mapped[int | None]
+    action: Mapped[str]
+    entity: Mapped[str]
+    entity_id: Mapped[int]
+    changes: Mapped[dict] = mapped_column(JSON)
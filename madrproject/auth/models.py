@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from madrproject.config.database import mapper_registry
+
+
+@mapper_registry.mapped_as_dataclass
+class RevokedToken:
+    __tablename__ = 'revoked_tokens'
+    jti: Mapped[str] = mapped_column(primary_key=True)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
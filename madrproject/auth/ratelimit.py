@@ -0,0 +1,303 @@
+"""
+Token-bucket rate limiting for the login endpoint.
+
+Every attempt on ``/auth/token/`` takes a token from the bucket of the
+client address and from the bucket of the target email. When either
+bucket is empty the request is rejected with 429 before the account is
+looked up or the password hasher runs.
+
+Buckets live in a pluggable backend: ``MemoryBackend`` keeps them in the
+worker process, ``SQLiteBackend`` keeps them in a local SQLite file that
+all the workers of a host share, standing in for a shared store. With
+per-process buckets every worker grants the full allowance, so N workers
+admit N times the configured rate; unless ``LOGIN_RATE_LIMIT_BACKEND``
+says otherwise, the shared backend is used whenever more than one worker
+serves the application. Buckets idle long enough to be full again are
+pruned periodically, since a missing bucket starts full anyway.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from http import HTTPStatus
+from typing import Protocol
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from madrproject.config.metrics import metrics
+from madrproject.config.settings import settings
+
+
+@dataclass(frozen=True)
+class BucketLimit:
+    capacity: float
+    per_second: float
+
+
+def take_token(
+    tokens: float, updated_at: float, now: float, limit: BucketLimit
+) -> tuple[float, float]:
+    """
+    Refills a bucket up to ``now`` and tries to take one token from it.
+
+    Args:
+        tokens (float): Tokens left after the previous update.
+        updated_at (float): Time of the previous update, in seconds.
+        now (float): Current time, in seconds.
+        limit (BucketLimit): Capacity and refill rate of the bucket.
+
+    Returns:
+        tuple: Tokens left in the bucket, and 0 if a token was taken or
+        the number of seconds until one becomes available.
+    """
+    elapsed = max(0.0, now - updated_at)
+    tokens = min(limit.capacity, tokens + elapsed * limit.per_second)
+
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.per_second
+
+
+class RateLimitBackend(Protocol):
+    def consume(self, key: str, limit: BucketLimit) -> float:
+        """
+        Takes one token from the bucket identified by ``key``.
+
+        Returns:
+            float: 0 if the token was taken, otherwise the number of
+            seconds until one becomes available.
+        """
+        ...
+
+    def prune(self, idle_seconds: float) -> int:
+        """
+        Forgets the buckets not updated for ``idle_seconds``.
+
+        Returns:
+            int: Number of buckets removed.
+        """
+        ...
+
+
+class MemoryBackend:
+    """
+    Buckets kept in the worker process, bounded to ``max_keys`` entries.
+
+    Least recently used buckets are evicted first; an evicted bucket
+    simply starts full again, so eviction can only make the limiter more
+    lenient for idle keys.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, limit: BucketLimit) -> float:
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+            tokens, wait = take_token(tokens, updated_at, now, limit)
+            self._buckets[key] = (tokens, now)
+
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return wait
+
+    def prune(self, idle_seconds: float) -> int:
+        cutoff = time.monotonic() - idle_seconds
+
+        with self._lock:
+            # Buckets are kept in update order, oldest first.
+            idle = []
+            for key, (_, updated_at) in self._buckets.items():
+                if updated_at > cutoff:
+                    break
+                idle.append(key)
+
+            for key in idle:
+                del self._buckets[key]
+        return len(idle)
+
+
+class SQLiteBackend:
+    """
+    Buckets kept in a SQLite file shared by the workers of one host.
+
+    Each update runs in an immediate transaction, so concurrent workers
+    serialize on the bucket row instead of losing updates.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # SQLite connections must not cross a fork; workers reconnect.
+        os.register_at_fork(after_in_child=self._forget_connections)
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+            'updated_at REAL NOT NULL)'
+        )
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS ix_rate_limit_buckets_updated_at '
+            'ON rate_limit_buckets (updated_at)'
+        )
+
+    def _forget_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key: str, limit: BucketLimit) -> float:
+        connection = self._connection()
+        now = time.time()
+
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets '
+                'WHERE key = ?',
+                (key,),
+            ).fetchone()
+            tokens, updated_at = row or (limit.capacity, now)
+            tokens, wait = take_token(tokens, updated_at, now, limit)
+            connection.execute(
+                'INSERT INTO rate_limit_buckets (key, tokens, updated_at) '
+                'VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+                'tokens = excluded.tokens, updated_at = excluded.updated_at',
+                (key, tokens, now),
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+        return wait
+
+    def prune(self, idle_seconds: float) -> int:
+        cursor = self._connection().execute(
+            'DELETE FROM rate_limit_buckets WHERE updated_at <= ?',
+            (time.time() - idle_seconds,),
+        )
+        return cursor.rowcount
+
+
+class LoginRateLimiter:
+    """
+    Applies the per-client and per-email buckets to login attempts.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        client_limit: BucketLimit,
+        email_limit: BucketLimit,
+    ):
+        self.backend = backend
+        self.client_limit = client_limit
+        self.email_limit = email_limit
+
+    def check(self, client: str, email: str) -> float:
+        """
+        Consumes one attempt for the client and the target email.
+
+        Args:
+            client (str): Address of the client making the attempt.
+            email (str): Email the client is trying to log in as.
+
+        Returns:
+            float: 0 if the attempt may proceed, otherwise the number of
+            seconds the client should wait before retrying.
+        """
+        wait = self.backend.consume(f'client:{client}', self.client_limit)
+        if wait:
+            metrics.increment('login_throttled_total', scope='client')
+            return wait
+
+        wait = self.backend.consume(
+            f'email:{email.strip().lower()}', self.email_limit
+        )
+        if wait:
+            metrics.increment('login_throttled_total', scope='email')
+        return wait
+
+    def prune(self) -> int:
+        """
+        Removes the buckets that have had time to refill completely.
+
+        Returns:
+            int: Number of buckets removed.
+        """
+        refill_seconds = max(
+            limit.capacity / limit.per_second
+            for limit in (self.client_limit, self.email_limit)
+        )
+        return self.backend.prune(refill_seconds)
+
+
+def build_login_rate_limiter() -> LoginRateLimiter:
+    backend_name = settings.LOGIN_RATE_LIMIT_BACKEND
+    if backend_name is None:
+        workers = settings.WEB_WORKERS or 1
+        backend_name = 'sqlite' if workers > 1 else 'memory'
+
+    if backend_name == 'sqlite':
+        backend = SQLiteBackend(settings.LOGIN_RATE_LIMIT_STORE)
+    else:
+        backend = MemoryBackend()
+
+    return LoginRateLimiter(
+        backend,
+        client_limit=BucketLimit(
+            capacity=settings.LOGIN_CLIENT_BURST,
+            per_second=settings.LOGIN_CLIENT_PER_MINUTE / 60,
+        ),
+        email_limit=BucketLimit(
+            capacity=settings.LOGIN_EMAIL_BURST,
+            per_second=settings.LOGIN_EMAIL_PER_MINUTE / 60,
+        ),
+    )
+
+
+@cache
+def get_login_rate_limiter() -> LoginRateLimiter:
+    """
+    Returns the limiter of the process, built on first use so that the
+    workers forked by the server know how many of them there are.
+    """
+    return build_login_rate_limiter()
+
+
+def prune_login_buckets() -> None:
+    get_login_rate_limiter().prune()
+
+
+def limit_login_attempts(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+):
+    client = request.client.host if request.client else 'unknown'
+    wait = get_login_rate_limiter().check(client, form_data.username)
+
+    if wait:
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many login attempts. Try again later.',
+            headers={'Retry-After': str(math.ceil(wait))},
+        )
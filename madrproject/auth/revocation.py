@@ -0,0 +1,145 @@
+"""
+Revocation of refresh tokens.
+
+Every refresh token carries a ``jti``. Revoked ids are written to the
+``revoked_tokens`` table and kept in memory until the token would have
+expired anyway, so checking a refresh token is a set lookup. The primary
+key on ``jti`` makes revocation atomic across workers: a token can be
+revoked, and therefore rotated, only once, even if two workers receive
+it at the same time.
+"""
+
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Engine, delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from madrproject.auth.models import RevokedToken
+from madrproject.config.database import utcnow
+from madrproject.config.metrics import metrics
+
+
+class RevocationList:
+    """
+    In-memory copy of the unexpired revoked token ids.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked: dict[str, float] = {}
+        self.loaded = False
+
+        metrics.register_collector('revoked_tokens', self.stats)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'loaded': self.loaded, 'entries': len(self._revoked)}
+
+    def load(self, session: Session) -> None:
+        """
+        Reads the unexpired revoked ids from the database.
+
+        Args:
+            session (Session): Session used to read the table.
+        """
+        rows = session.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                RevokedToken.expires_at > utcnow()
+            )
+        ).all()
+
+        with self._lock:
+            self._revoked.update(
+                (jti, _timestamp(expires_at)) for jti, expires_at in rows
+            )
+            self.loaded = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self.loaded = False
+
+    def _prune(self) -> None:
+        now = time.time()
+        for jti in [j for j, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+
+    def is_revoked(self, session: Session, jti: str) -> bool:
+        if not self.loaded:
+            self.load(session)
+
+        with self._lock:
+            return jti in self._revoked
+
+    def revoke(self, session: Session, jti: str, expires_at: float) -> bool:
+        """
+        Revokes a token id, once.
+
+        Args:
+            session (Session): Session used to persist the revocation.
+            jti (str): ID of the token.
+            expires_at (float): Expiration of the token, as a timestamp.
+
+        Returns:
+            bool: False if the id had already been revoked, possibly by
+            another worker.
+        """
+        session.add(
+            RevokedToken(
+                jti=jti,
+                expires_at=datetime.fromtimestamp(
+                    expires_at, tz=ZoneInfo('UTC')
+                ).replace(tzinfo=None),
+            )
+        )
+        try:
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            revoked = False
+        else:
+            revoked = True
+
+        with self._lock:
+            self._revoked[jti] = expires_at
+            self._prune()
+        return revoked
+
+    @staticmethod
+    def purge_expired(session: Session) -> int:
+        """
+        Deletes the revocations of tokens that have expired.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        result = session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= utcnow())
+        )
+        session.commit()
+        return result.rowcount
+
+
+def _timestamp(expires_at: datetime) -> float:
+    return expires_at.replace(tzinfo=ZoneInfo('UTC')).timestamp()
+
+
+revocations = RevocationList()
+
+
+def purge_revoked_tokens(engine: Engine) -> int:
+    """
+    Deletes the revocations of expired tokens, run by the maintenance loop.
+
+    Args:
+        engine (Engine): Engine of the writer database.
+
+    Returns:
+        int: Number of rows deleted.
+    """
+    with Session(engine) as session:
+        return revocations.purge_expired(session)
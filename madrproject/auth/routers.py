@@ -2,28 +2,38 @@ from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from madrproject.accounts.models import Account
+from madrproject.auth.ratelimit import limit_login_attempts
+from madrproject.auth.revocation import revocations
 from madrproject.auth.schemas import Token
 from madrproject.config.database import get_session
 from madrproject.config.security import (
+    REFRESH_TOKEN_TYPE,
     create_access_token,
-    get_current_account,
+    create_refresh_token,
+    credentials_exception,
+    decode_token,
+    oauth2_schema,
     verify_password,
 )
+from madrproject.config.statements import ACCOUNT_BY_EMAIL
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 
-@router.post('/token/', response_model=Token)
+@router.post(
+    '/token/',
+    response_model=Token,
+    dependencies=[Depends(limit_login_attempts)],
+)
 def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(get_session),
 ):
     account: Account = session.scalar(
-        select(Account).where(Account.email == form_data.username)
+        ACCOUNT_BY_EMAIL, {'email': form_data.username}
     )
 
     if not account or not verify_password(
@@ -36,13 +46,85 @@ def login_for_access_token(
 
     access_token = create_access_token(data_payload={'sub': account.email})
 
-    return {'access_token': access_token, 'token_type': 'Bearer'}
+    return {
+        'access_token': access_token,
+        'token_type': 'Bearer',
+        'refresh_token': create_refresh_token(account.email),
+    }
+
+
+def get_token_claims(
+    token: str = Depends(oauth2_schema),
+    session: Session = Depends(get_session),
+) -> dict:
+    """
+    Validates the bearer token and, for a refresh token, its revocation.
+
+    Raises:
+        HTTPException: If the token is invalid, expired or revoked.
+
+    Returns:
+        dict: The claims of the token.
+    """
+    payload = decode_token(token)
+
+    if payload.get('typ') == REFRESH_TOKEN_TYPE and (
+        not payload.get('jti')
+        or revocations.is_revoked(session, payload['jti'])
+    ):
+        raise credentials_exception()
+
+    return payload
 
 
 @router.post('/refresh_token/', response_model=Token)
 def refresh_access_token(
-    account: Account = Depends(get_current_account),
+    claims: dict = Depends(get_token_claims),
+    session: Session = Depends(get_session),
 ):
-    new_access_token = create_access_token(data_payload={'sub': account.email})
+    """
+    Exchanges a refresh token for a new access token and refresh token.
+
+    The refresh token is rotated: it is revoked as it is used, so each
+    one can be exchanged only once, and neither the account table nor
+    the password hasher is involved. A still valid access token is also
+    accepted, as before, and renewed for an access token only.
+    """
+    if claims.get('typ') != REFRESH_TOKEN_TYPE:
+        account = session.scalar(ACCOUNT_BY_EMAIL, {'email': claims['sub']})
+        if account is None:
+            raise credentials_exception()
+
+        return {
+            'access_token': create_access_token(
+                data_payload={'sub': account.email}
+            ),
+            'token_type': 'bearer',
+        }
+
+    if not revocations.revoke(session, claims['jti'], claims['exp']):
+        raise credentials_exception()
+
+    return {
+        'access_token': create_access_token(
+            data_payload={'sub': claims['sub']}
+        ),
+        'token_type': 'bearer',
+        'refresh_token': create_refresh_token(claims['sub']),
+    }
+
+
+@router.post('/logout/')
+def logout(
+    claims: dict = Depends(get_token_claims),
+    session: Session = Depends(get_session),
+):
+    """
+    Revokes the refresh token sent as the bearer token.
+    """
+    if claims.get('typ') != REFRESH_TOKEN_TYPE:
+        raise credentials_exception()
+
+    revocations.revoke(session, claims['jti'], claims['exp'])
 
-    return {'access_token': new_access_token, 'token_type': 'bearer'}
+    return {'message': 'The session was successfully closed.'}
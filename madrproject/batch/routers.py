@@ -0,0 +1,247 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from madrproject.batch.schemas import (
+    BatchOperationSchema,
+    BatchResultListSchema,
+    BatchSchema,
+)
+from madrproject.books.repository import BooksRepository
+from madrproject.books.schemas import (
+    BookSchemaPublic,
+    BookSchemaUpdate,
+    BooksSchema,
+)
+from madrproject.config.dependencies import T_CurrentAccount, T_Session
+from madrproject.config.settings import settings
+from madrproject.novelists.repository import NovelistRepository
+from madrproject.novelists.schemas import (
+    NovelistPublicSchema,
+    NovelistSchema,
+    UpdateNovelistSchema,
+)
+
+router = APIRouter(prefix='/batch', tags=['batch'])
+
+
+def resolve_references(value, results: list[dict]):
+    """
+    Replaces ``'$<n>'`` placeholders with the ID produced by operation n.
+
+    This lets a batch create a novelist and its books in one request,
+    e.g. ``{"novelist_id": "$0"}``.
+
+    Args:
+        value: Operation ID or data value, possibly a placeholder.
+        results (list[dict]): Results of the operations already run.
+
+    Raises:
+        HTTPException: If the placeholder points to an operation that has
+            not run yet or produced no ID.
+
+    Returns:
+        The value with placeholders resolved.
+    """
+    if isinstance(value, dict):
+        return {
+            key: resolve_references(item, results)
+            for key, item in value.items()
+        }
+
+    if not (isinstance(value, str) and value.startswith('$')):
+        return value
+
+    index = value[1:]
+    if not index.isdigit() or int(index) >= len(results):
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=f'Reference {value} does not point to a previous '
+            'operation.',
+        )
+    return results[int(index)]['data']['id']
+
+
+def run_book_operation(
+    operation: BatchOperationSchema, repository: BooksRepository
+) -> tuple[int, dict]:
+    if operation.op == 'create':
+        book = BooksSchema.model_validate(operation.data)
+
+        if not repository.get_novelist_by_id(book.novelist_id):
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=f'Novelist ID {book.novelist_id} was not found.',
+            )
+        if repository.get_book_by_title(book.title):
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT, detail='Book already exists.'
+            )
+
+        book_db = repository.create_book(book)
+        return HTTPStatus.CREATED, BookSchemaPublic.model_validate(
+            book_db, from_attributes=True
+        ).model_dump()
+
+    book_db = repository.get_book_by_id(operation.id)
+    if not book_db:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'The book ID {operation.id} was not found.',
+        )
+
+    if operation.op == 'delete':
+        repository.delete_book(book_db)
+        return HTTPStatus.OK, {'id': operation.id}
+
+    book = BookSchemaUpdate.model_validate(operation.data)
+    book_db = repository.update_book(
+        book_db, book.model_dump(exclude_unset=True)
+    )
+    return HTTPStatus.OK, BookSchemaPublic.model_validate(
+        book_db, from_attributes=True
+    ).model_dump()
+
+
+def run_novelist_operation(
+    operation: BatchOperationSchema, repository: NovelistRepository
+) -> tuple[int, dict]:
+    if operation.op == 'create':
+        novelist = NovelistSchema.model_validate(operation.data)
+
+        if repository.get_novelist_by_name(novelist.name):
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail=f'The novelist with name {novelist.name} already '
+                'exists.',
+            )
+
+        novelist_db = repository.create_novelist(novelist.name)
+        return HTTPStatus.CREATED, NovelistPublicSchema.model_validate(
+            novelist_db, from_attributes=True
+        ).model_dump()
+
+    novelist_db = repository.get_novelist_by_id(operation.id)
+    if not novelist_db:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'Novelist with ID {operation.id} was not found',
+        )
+
+    if operation.op == 'delete':
+        repository.delete_novelist(novelist_db)
+        return HTTPStatus.OK, {'id': operation.id}
+
+    novelist = UpdateNovelistSchema.model_validate(operation.data)
+    novelist_db = repository.update_novelist(
+        novelist_db, novelist.model_dump(exclude_unset=True)
+    )
+    return HTTPStatus.OK, NovelistPublicSchema.model_validate(
+        novelist_db, from_attributes=True
+    ).model_dump()
+
+
+@router.post(
+    '/', response_model=BatchResultListSchema, status_code=HTTPStatus.OK
+)
+def run_batch(
+    batch: BatchSchema, session: T_Session, account: T_CurrentAccount
+):
+    """
+    Route to run several book and novelist operations atomically.
+
+    The operations run in order, in one session and one transaction,
+    behind a single authentication check. If any operation fails, the
+    whole batch is rolled back and the error names the failing operation.
+
+    Args:
+        batch (BatchSchema): Operations to run.
+        session (Session): Dependency for database session.
+        account (T_CurrentAccount): Current authenticated account.
+
+    Raises:
+        HTTPException: If the batch is too large or an operation fails.
+
+    Returns:
+        dict: One result per operation, in request order.
+    """
+    if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=(
+                f'A batch accepts at most {settings.BATCH_MAX_OPERATIONS} '
+                'operations.'
+            ),
+        )
+
+    books = BooksRepository(session, autocommit=False)
+    novelists = NovelistRepository(session, autocommit=False)
+    results = []
+
+    for index, operation in enumerate(batch.operations):
+        try:
+            resolved = operation.model_copy(
+                update={
+                    'id': resolve_references(operation.id, results),
+                    'data': resolve_references(operation.data, results),
+                }
+            )
+
+            if resolved.op != 'create' and not isinstance(resolved.id, int):
+                raise HTTPException(
+                    status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                    detail=f'The {resolved.op} operation requires an ID.',
+                )
+
+            if resolved.entity == 'book':
+                status, data = run_book_operation(resolved, books)
+            else:
+                status, data = run_novelist_operation(resolved, novelists)
+
+        except HTTPException as error:
+            session.rollback()
+            raise HTTPException(
+                status_code=error.status_code,
+                detail={'index': index, 'detail': error.detail},
+            )
+        except ValidationError as error:
+            session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail={
+                    'index': index,
+                    'detail': error.errors(
+                        include_url=False, include_context=False
+                    ),
+                },
+            )
+        except IntegrityError:
+            session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail={'index': index, 'detail': 'Integrity error.'},
+            )
+        except StaleDataError:
+            session.rollback()
+            raise HTTPException(
+                status_code=HTTPStatus.PRECONDITION_FAILED,
+                detail={
+                    'index': index,
+                    'detail': 'The resource was modified by another request.',
+                },
+            )
+
+        results.append({
+            'index': index,
+            'op': operation.op,
+            'entity': operation.entity,
+            'status': status,
+            'data': data,
+        })
+
+    session.commit()
+
+    return {'results': results}
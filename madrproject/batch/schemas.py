@@ -0,0 +1,26 @@
+from typing import Any, List, Literal
+
+from pydantic import BaseModel
+
+
+class BatchOperationSchema(BaseModel):
+    op: Literal['create', 'update', 'delete']
+    entity: Literal['book', 'novelist']
+    id: int | str | None = None
+    data: dict[str, Any] = {}
+
+
+class BatchSchema(BaseModel):
+    operations: List[BatchOperationSchema]
+
+
+class BatchResultSchema(BaseModel):
+    index: int
+    op: str
+    entity: str
+    status: int
+    data: dict[str, Any]
+
+
+class BatchResultListSchema(BaseModel):
+    results: List[BatchResultSchema]
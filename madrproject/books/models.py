@@ -1,7 +1,9 @@
-from sqlalchemy import ForeignKey
+from datetime import datetime
+
+from sqlalchemy import BigInteger, ForeignKey, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from madrproject.config.database import mapper_registry
+from madrproject.config.database import mapper_registry, utcnow
 
 
 @mapper_registry.mapped_as_dataclass
@@ -11,6 +13,27 @@ class Books:
     year: Mapped[int]
     title: Mapped[str]
     novelist_id: Mapped[int] = mapped_column(ForeignKey('novelists.id'))
+    updated_at: Mapped[datetime] = mapped_column(
+        init=False,
+        insert_default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+    )
+    version_id: Mapped[int] = mapped_column(
+        init=False, server_default=text('1')
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        init=False,
+        default=0,
+        server_default=text('0'),
+        index=True,
+    )
     novelist: Mapped['Novelist'] = relationship(
         'Novelist', back_populates='books', init=False
     )
+
+    __table_args__ = (
+        Index('ix_books_novelist_id_year_id', 'novelist_id', 'year', 'id'),
+    )
+    __mapper_args__ = {'version_id_col': version_id}
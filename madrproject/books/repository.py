@@ -1,9 +1,18 @@
 from typing import Sequence, Type
 
+from sqlalchemy import Select, update
 from sqlalchemy.future import select
 from sqlalchemy.orm import Session
 
 from madrproject.books.models import Books
+from madrproject.books.schemas import BookListQuery
+from madrproject.changes.repository import ChangesRepository
+from madrproject.changes.sequence import next_change_seq
+from madrproject.config.statements import (
+    BOOK_BY_ID,
+    BOOK_BY_TITLE,
+    NOVELIST_BY_ID,
+)
 from madrproject.novelists.models import Novelist
 
 
@@ -12,14 +21,46 @@ class BooksRepository:
     Repository class for managing books in the database.
     """
 
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, autocommit: bool = True):
         """
         Initializes the repository with a database session.
 
         Args:
             session (Session): SQLAlchemy session for database interaction.
+            autocommit (bool): Commit after each write. When False, writes
+                are only flushed and the caller owns the transaction.
         """
         self.session = session
+        self.autocommit = autocommit
+
+    def _save(self, book: Books | None = None) -> None:
+        if not self.autocommit:
+            self.session.flush()
+            return
+
+        self.session.commit()
+        if book is not None:
+            self.session.refresh(book)
+
+    def _adjust_book_count(self, novelist_id: int, delta: int) -> None:
+        """
+        Shifts the denormalized book counter of a novelist.
+
+        The increment is done by the database inside the current
+        transaction, so concurrent writers never lose an update.
+
+        Args:
+            novelist_id (int): ID of the novelist whose counter changes.
+            delta (int): Amount to add to the counter (may be negative).
+        """
+        self.session.execute(
+            update(Novelist)
+            .where(Novelist.id == novelist_id)
+            .values(
+                book_count=Novelist.book_count + delta,
+                change_seq=next_change_seq(self.session),
+            )
+        )
 
     def create_book(self, book: Books) -> Books:
         """
@@ -37,8 +78,8 @@ class BooksRepository:
             novelist_id=book.novelist_id,
         )
         self.session.add(new_book)
-        self.session.commit()
-        self.session.refresh(new_book)
+        self._adjust_book_count(new_book.novelist_id, 1)
+        self._save(new_book)
         return new_book
 
     def get_novelist_by_id(self, novelist_id: int) -> Type[Novelist] | None:
@@ -51,10 +92,8 @@ class BooksRepository:
         Returns:
             Novelist: The novelist object, or None if not found.
         """
-        return (
-            self.session.query(Novelist)
-            .filter(Novelist.id == novelist_id)
-            .first()
+        return self.session.scalar(
+            NOVELIST_BY_ID, {'novelist_id': novelist_id}
         )
 
     def get_book_by_title(self, title: str) -> Type[Books] | None:
@@ -67,7 +106,7 @@ class BooksRepository:
         Returns:
             Books: The book object, or None if not found.
         """
-        return self.session.query(Books).filter(Books.title == title).first()
+        return self.session.scalar(BOOK_BY_TITLE, {'title': title})
 
     def update_book(self, book_db: Books, updated_data: dict) -> Books:
         """
@@ -80,12 +119,18 @@ class BooksRepository:
         Returns:
             Books: The updated book object.
         """
+        previous_novelist_id = book_db.novelist_id
+
         for key, value in updated_data.items():
             setattr(book_db, key, value)
 
         self.session.add(book_db)
-        self.session.commit()
-        self.session.refresh(book_db)
+
+        if book_db.novelist_id != previous_novelist_id:
+            self._adjust_book_count(previous_novelist_id, -1)
+            self._adjust_book_count(book_db.novelist_id, 1)
+
+        self._save(book_db)
         return book_db
 
     def get_book_by_id(self, book_id: int) -> Books:
@@ -98,32 +143,54 @@ class BooksRepository:
         Returns:
             Books: The book object, or None if not found.
         """
-        return self.session.scalar(select(Books).where(Books.id == book_id))
+        return self.session.scalar(BOOK_BY_ID, {'book_id': book_id})
 
-    def list_books(
-        self, limit: int, offset: int, title: str = None, year: int = None
-    ) -> Sequence[Books]:
+    @staticmethod
+    def list_books_query(filters: BookListQuery) -> Select:
         """
-        Retrieves a list of books from the database with optional filters.
+        Builds the statement listing the books matching the filters.
+
+        Filtering by novelist and sorting by year is a range scan of the
+        ``(novelist_id, year, id)`` index, in either direction.
 
         Args:
-            limit (int): Maximum number of books to return.
-            offset (int): Number of books to skip.
-            title (str, optional): Partial match for book title.
-            year (int, optional): Filter by publication year.
+            filters (BookListQuery): Paging, filters and order. Ties in
+                the order are broken by ID.
 
         Returns:
-            list: List of book objects.
+            Select: The statement selecting the page of books.
         """
         query = select(Books)
 
-        if title:
-            query = query.filter(Books.title.contains(title))
+        if filters.title:
+            query = query.filter(Books.title.contains(filters.title))
+
+        if filters.year:
+            query = query.filter(Books.year == filters.year)
+
+        if filters.novelist_id is not None:
+            query = query.filter(Books.novelist_id == filters.novelist_id)
+
+        if filters.sort == 'year':
+            query = query.order_by(Books.year, Books.id)
+        elif filters.sort == '-year':
+            query = query.order_by(Books.year.desc(), Books.id.desc())
+        elif filters.sort == 'title':
+            query = query.order_by(Books.title, Books.id)
+
+        return query.offset(filters.offset).limit(filters.limit)
+
+    def list_books(self, filters: BookListQuery) -> Sequence[Books]:
+        """
+        Retrieves a list of books from the database with optional filters.
 
-        if year:
-            query = query.filter(Books.year == year)
+        Args:
+            filters (BookListQuery): Paging, filters and order.
 
-        return self.session.scalars(query.offset(offset).limit(limit)).all()
+        Returns:
+            list: List of book objects.
+        """
+        return self.session.scalars(self.list_books_query(filters)).all()
 
     def delete_book(self, book_db: Books) -> None:
         """
@@ -133,4 +200,6 @@ class BooksRepository:
             book_db (Books): The book object to delete.
         """
         self.session.delete(book_db)
-        self.session.commit()
+        self._adjust_book_count(book_db.novelist_id, -1)
+        ChangesRepository(self.session).record_deletions('book', [book_db.id])
+        self._save()
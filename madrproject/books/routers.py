@@ -1,19 +1,38 @@
 from http import HTTPStatus
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm.exc import StaleDataError
 
+from madrproject.books.models import Books
 from madrproject.books.repository import (
     BooksRepository,
 )
 from madrproject.books.schemas import (
+    BookListQuery,
     BookSchemaList,
     BookSchemaPublic,
     BookSchemaUpdate,
     BooksSchema,
+    BookSuggestionListSchema,
 )
+from madrproject.changes.repository import ChangesRepository
+from madrproject.changes.schemas import BookChangesSchema
+from madrproject.config.autocomplete import PrefixIndex
+from madrproject.config.coalescing import SingleFlight
+from madrproject.config.concurrency import raise_precondition_failed
 from madrproject.config.dependencies import *
+from madrproject.config.settings import settings
 
 router = APIRouter(prefix='/book', tags=['book'])
+book_reads = SingleFlight('books', timeout=settings.COALESCE_WAIT_SECONDS)
+book_titles = PrefixIndex(
+    'book_titles',
+    Books,
+    'title',
+    'book',
+    max_entries=settings.AUTOCOMPLETE_MAX_ENTRIES,
+)
 
 
 @router.post(
@@ -62,18 +81,25 @@ def update_book(
     book_id: int,
     session: T_Session,
     account: T_CurrentAccount,
+    precondition: T_Precondition,
 ):
     """
     Route to update an existing book.
 
+    The update only applies if the book still has the version it was read
+    with, and, when If-Match is sent, the version the client last saw.
+
     Args:
         book (BookSchemaUpdate): Schema with updated book details.
         book_id (int): ID of the book to update.
         session (Session): Dependency for database session.
         account (T_CurrentAccount): Current authenticated account.
+        precondition (Precondition): If-Match of the request, and the
+            ETag of the response.
 
     Raises:
-        HTTPException: If the book ID is not found.
+        HTTPException: If the book ID is not found, or if the book was
+            modified by another request (412).
 
     Returns:
         BookSchemaPublic: The updated book's details.
@@ -87,9 +113,17 @@ def update_book(
             detail=f'The book ID {book_id} was not found.',
         )
 
-    updated_book = repository.update_book(
-        book_db, book.model_dump(exclude_unset=True)
-    )
+    precondition.check(book_db.version_id)
+
+    try:
+        updated_book = repository.update_book(
+            book_db, book.model_dump(exclude_unset=True)
+        )
+    except StaleDataError:
+        session.rollback()
+        raise_precondition_failed()
+
+    precondition.set_etag(updated_book.version_id)
     return updated_book
 
 
@@ -97,28 +131,105 @@ def update_book(
 def list_books(
     session: T_Session,
     account: T_CurrentAccount,
-    limit: int = 3,
-    offset: int = 0,
-    title: str = None,
-    year: int = None,
+    filters: Annotated[BookListQuery, Depends()],
 ):
     """
     Route to list books with optional filters.
 
     Args:
-        limit (int): Maximum number of books to return. Default is 3.
-        offset (int): Number of books to skip. Default is 0.
-        title (str, optional): Filter by title. Default is None.
-        year (int, optional): Filter by year. Default is None.
         session (Session): Dependency for database session.
         account (T_CurrentAccount): Current authenticated account.
+        filters (BookListQuery): Paging (``limit``, default 3, and
+            ``offset``), filters on ``title``, ``year`` and
+            ``novelist_id``, and ``sort`` (``year``, ``-year`` or
+            ``title``), from the query string.
+
+    Identical concurrent calls share a single query and serialization.
 
     Returns:
-        dict: A list of books.
+        Response: A list of books, serialized as JSON.
     """
-    repository = BooksRepository(session)
-    books = repository.list_books(limit, offset, title, year)
-    return {'books': books}
+
+    def read_books() -> str:
+        books = BooksRepository(session).list_books(filters)
+        return BookSchemaList.model_validate(
+            {'books': books}, from_attributes=True
+        ).model_dump_json()
+
+    payload = book_reads.do(('list', filters), read_books)
+    return Response(content=payload, media_type='application/json')
+
+
+@router.get(
+    '/autocomplete',
+    response_model=BookSuggestionListSchema,
+    status_code=HTTPStatus.OK,
+)
+def autocomplete_books(
+    q: Annotated[str, Query(min_length=1)],
+    session: T_Session,
+    account: T_CurrentAccount,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.AUTOCOMPLETE_MAX_RESULTS)
+    ] = 10,
+):
+    """
+    Route to suggest books whose title starts with the typed text.
+
+    Served from an in-memory prefix index rather than a table scan, so it
+    can be called on every keystroke.
+
+    Args:
+        q (str): Beginning of the title, case-insensitive.
+        session (Session): Dependency for database session.
+        account (T_CurrentAccount): Current authenticated account.
+        limit (int): Maximum number of suggestions. Default is 10.
+
+    Returns:
+        dict: Matching book IDs and titles, in title order.
+    """
+    matches = book_titles.search(session, q, limit)
+    return {
+        'suggestions': [
+            {'id': book_id, 'title': title} for book_id, title in matches
+        ]
+    }
+
+
+@router.get(
+    '/changes', response_model=BookChangesSchema, status_code=HTTPStatus.OK
+)
+def list_book_changes(
+    session: T_Session,
+    account: T_CurrentAccount,
+    since: str | None = None,
+    limit: int = 100,
+):
+    """
+    Route to fetch books changed or deleted since the last sync.
+
+    Args:
+        since (str, optional): Cursor returned by the previous call.
+            Omit it to start a full sync.
+        limit (int): Maximum number of changes and deletions to return.
+        session (Session): Dependency for database session.
+        account (T_CurrentAccount): Current authenticated account.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+
+    Returns:
+        dict: Changed books, deleted book IDs and the next cursor.
+    """
+    repository = ChangesRepository(session)
+
+    try:
+        return repository.list_changes(Books, 'book', since, limit)
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid change cursor.',
+        )
 
 
 @router.delete('/{book_id}', status_code=HTTPStatus.OK)
@@ -126,12 +237,16 @@ def delete_book(book_id: int, session: T_Session, account: T_CurrentAccount):
     """
     Route to delete a book by ID.
 
+    The delete only applies if the book still has the version it was
+    read with.
+
     Args:
         book_id (int): ID of the book to delete.
         session (Session): Dependency for database session.
 
     Raises:
-        HTTPException: If the book ID is not found.
+        HTTPException: If the book ID is not found, or if the book was
+            modified by another request (412).
     """
     repository = BooksRepository(session)
 
@@ -142,6 +257,10 @@ def delete_book(book_id: int, session: T_Session, account: T_CurrentAccount):
             detail=f'The book ID {book_id} was not found.',
         )
 
-    repository.delete_book(book_db)
+    try:
+        repository.delete_book(book_db)
+    except StaleDataError:
+        session.rollback()
+        raise_precondition_failed()
 
     return {}
@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Literal
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class BooksSchema(BaseModel):
@@ -15,12 +15,39 @@ class BooksSchema(BaseModel):
 
 class BookSchemaPublic(BooksSchema):
     id: int
+    version_id: int
 
 
 class BookSchemaList(BaseModel):
     books: List[BookSchemaPublic]
 
 
+class BookListQuery(BaseModel):
+    """
+    Paging, filters and order of ``GET /book/``.
+
+    Frozen, so a query can key the coalescing of identical reads.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    limit: int = 3
+    offset: int = 0
+    title: str | None = None
+    year: int | None = None
+    novelist_id: int | None = None
+    sort: Literal['year', '-year', 'title'] | None = None
+
+
+class BookSuggestionSchema(BaseModel):
+    id: int
+    title: str
+
+
+class BookSuggestionListSchema(BaseModel):
+    suggestions: List[BookSuggestionSchema]
+
+
 class BookSchemaUpdate(BaseModel):
     year: int | None = None
     title: str | None = None
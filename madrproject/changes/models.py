@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, BigInteger, Index, event, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from madrproject.config.database import mapper_registry, utcnow
+
+
+@mapper_registry.mapped_as_dataclass
+class Tombstone:
+    __tablename__ = 'tombstones'
+    __table_args__ = (
+        Index('ix_tombstones_entity_change_seq', 'entity', 'change_seq', 'id'),
+    )
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    entity: Mapped[str]
+    entity_id: Mapped[int]
+    change_seq: Mapped[int] = mapped_column(BigInteger)
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, insert_default=utcnow, server_default=func.now()
+    )
+
+
+@mapper_registry.mapped_as_dataclass
+class ChangeSequence:
+    __tablename__ = 'change_sequence'
+    id: Mapped[int] = mapped_column(primary_key=True)
+    value: Mapped[int]
+
+
+event.listen(
+    ChangeSequence.__table__,
+    'after_create',
+    DDL('INSERT INTO change_sequence (id, value) VALUES (1, 0)'),
+)
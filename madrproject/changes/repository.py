@@ -0,0 +1,156 @@
+import base64
+import json
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from madrproject.changes.models import Tombstone
+from madrproject.changes.sequence import (
+    committed_position,
+    next_change_seq,
+)
+
+Position = tuple[int, int] | None
+
+
+def encode_cursor(updated: Position, deleted: Position) -> str:
+    """
+    Packs the positions of both change streams into an opaque cursor.
+
+    Args:
+        updated (tuple | None): (change_seq, id) of the last changed row.
+        deleted (tuple | None): (change_seq, id) of the last tombstone.
+
+    Returns:
+        str: URL-safe cursor to be sent back as ``since``.
+    """
+    payload = {
+        'u': list(updated) if updated else None,
+        'd': list(deleted) if deleted else None,
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[Position, Position]:
+    """
+    Unpacks a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): Cursor received from the client.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+
+    Returns:
+        tuple: The (updated, deleted) positions.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return tuple(
+            (int(position[0]), int(position[1])) if position else None
+            for position in (payload['u'], payload['d'])
+        )
+    except (TypeError, KeyError, IndexError, ValueError) as error:
+        raise ValueError('Invalid change cursor.') from error
+
+
+class ChangesRepository:
+    """
+    Repository class for the incremental change feed and its tombstones.
+    """
+
+    def __init__(self, session: Session):
+        """
+        Initializes the repository with a database session.
+
+        Args:
+            session (Session): SQLAlchemy session for database interaction.
+        """
+        self.session = session
+
+    def record_deletions(self, entity: str, entity_ids: list[int]) -> None:
+        """
+        Adds tombstones for deleted rows to the current transaction.
+
+        The rows are written with a single multi-row INSERT.
+
+        Args:
+            entity (str): Kind of the deleted rows ('book' or 'novelist').
+            entity_ids (list[int]): IDs of the deleted rows.
+        """
+        if entity_ids:
+            change_seq = next_change_seq(self.session)
+            self.session.execute(
+                insert(Tombstone),
+                [
+                    {
+                        'entity': entity,
+                        'entity_id': entity_id,
+                        'change_seq': change_seq,
+                    }
+                    for entity_id in entity_ids
+                ],
+            )
+
+    def list_changes(
+        self, model, entity: str, since: str | None, limit: int
+    ) -> dict:
+        """
+        Retrieves rows changed and deleted after the given cursor.
+
+        Both streams are read with keyset pagination on indexed
+        (change_seq, id) pairs, so the cost depends only on the number of
+        changes since the cursor. Only rows up to the committed position
+        are returned, so a row committed after a cursor was issued always
+        sorts after it.
+
+        Args:
+            model: Mapped class with ``change_seq`` and ``id`` columns.
+            entity (str): Tombstone kind matching the model.
+            since (str, optional): Cursor from a previous call.
+            limit (int): Maximum number of rows read from each stream.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        Returns:
+            dict: Changed rows, deleted IDs, next cursor and has_more flag.
+        """
+        updated, deleted = decode_cursor(since) if since else (None, None)
+        position = committed_position(self.session)
+
+        query = (
+            select(model)
+            .where(model.change_seq <= position)
+            .order_by(model.change_seq, model.id)
+        )
+        if updated:
+            query = query.where(tuple_(model.change_seq, model.id) > updated)
+        changes = self.session.scalars(query.limit(limit)).all()
+
+        query = (
+            select(Tombstone)
+            .where(
+                Tombstone.entity == entity, Tombstone.change_seq <= position
+            )
+            .order_by(Tombstone.change_seq, Tombstone.id)
+        )
+        if deleted:
+            query = query.where(
+                tuple_(Tombstone.change_seq, Tombstone.id) > deleted
+            )
+        tombstones = self.session.scalars(query.limit(limit)).all()
+
+        if changes:
+            updated = (changes[-1].change_seq, changes[-1].id)
+        if tombstones:
+            deleted = (tombstones[-1].change_seq, tombstones[-1].id)
+
+        return {
+            'changes': changes,
+            'deleted': [tombstone.entity_id for tombstone in tombstones],
+            'cursor': encode_cursor(updated, deleted),
+            'has_more': len(changes) == limit or len(tombstones) == limit,
+        }
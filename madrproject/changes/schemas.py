@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+from madrproject.books.schemas import BookSchemaPublic
+
+
+class BookChangeSchema(BookSchemaPublic):
+    updated_at: datetime
+
+
+class BookChangesSchema(BaseModel):
+    changes: List[BookChangeSchema]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
+
+
+class NovelistChangeSchema(BaseModel):
+    id: int
+    name: str
+    book_count: int
+    updated_at: datetime
+
+
+class NovelistChangesSchema(BaseModel):
+    changes: List[NovelistChangeSchema]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
@@ -0,0 +1,119 @@
+"""
+Commit-ordered sequence numbers for the change feeds.
+
+Timestamps are taken when a row is flushed, not when its transaction
+commits, so a transaction that flushes early and commits late would
+slip behind a cursor that already moved past its timestamp. Instead,
+every transaction that writes books, novelists or tombstones stamps all
+the rows it writes with one sequence number, and readers only look at
+numbers below a horizon that no running transaction can still commit
+under.
+
+On PostgreSQL the number is the transaction id (``pg_current_xact_id``,
+a 64-bit counter that never wraps) and the horizon is the ``xmin`` of
+the reader's snapshot: every transaction with a lower id has ended, so
+nothing new can appear below it. Writers take no lock for this; a row
+simply stays out of the feed until the transactions started before it
+have finished.
+
+SQLite has a single writer, so there the number comes from the
+``change_sequence`` row: incrementing it serializes nothing that was not
+already serialized, and its committed value is the horizon.
+"""
+
+from sqlalchemy import event, select, text, update
+from sqlalchemy.orm import Session
+
+from madrproject.books.models import Books
+from madrproject.changes.models import ChangeSequence
+from madrproject.novelists.models import Novelist
+
+SEQUENCE_KEY = 'change_seq'
+FEED_MODELS = (Books, Novelist)
+
+CURRENT_XACT_ID = text('SELECT pg_current_xact_id()::text::bigint')
+SNAPSHOT_XMIN = text(
+    'SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+)
+
+
+def _is_postgresql(session: Session) -> bool:
+    return session.get_bind().dialect.name == 'postgresql'
+
+
+def next_change_seq(session: Session) -> int:
+    """
+    Returns the sequence number of the session's current transaction,
+    drawing it on first use.
+
+    Args:
+        session (Session): Session writing catalog rows.
+
+    Returns:
+        int: Sequence number to stamp on the rows changed.
+    """
+    change_seq = session.info.get(SEQUENCE_KEY)
+    if change_seq is not None:
+        return change_seq
+
+    with session.no_autoflush:
+        if _is_postgresql(session):
+            change_seq = session.scalar(CURRENT_XACT_ID)
+        else:
+            change_seq = session.execute(
+                update(ChangeSequence)
+                .where(ChangeSequence.id == 1)
+                .values(value=ChangeSequence.value + 1)
+                .returning(ChangeSequence.value)
+                .execution_options(synchronize_session=False)
+            ).scalar_one()
+    session.info[SEQUENCE_KEY] = change_seq
+    return change_seq
+
+
+def committed_position(session: Session) -> int:
+    """
+    Returns the highest sequence number up to which every change is
+    committed and visible to the session.
+
+    Readers of the feed must not go past it: a transaction still running
+    may commit rows numbered above it, but never at or below it.
+
+    Args:
+        session (Session): Session reading the feed.
+
+    Returns:
+        int: The horizon of the session's snapshot.
+    """
+    if _is_postgresql(session):
+        return session.scalar(SNAPSHOT_XMIN) - 1
+
+    return session.scalar(
+        select(ChangeSequence.value).where(ChangeSequence.id == 1)
+    )
+
+
+@event.listens_for(Session, 'before_flush')
+def _stamp_changes(session, flush_context, instances):
+    changed = [
+        instance
+        for instance in session.new
+        if isinstance(instance, FEED_MODELS)
+    ] + [
+        instance
+        for instance in session.dirty
+        if isinstance(instance, FEED_MODELS)
+        and session.is_modified(instance, include_collections=False)
+    ]
+    if not changed:
+        return
+
+    change_seq = next_change_seq(session)
+    for instance in changed:
+        instance.change_seq = change_seq
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _release_sequence(session):
+    session.info.pop(SEQUENCE_KEY, None)
@@ -0,0 +1,148 @@
+"""
+Threadpool sizing and admission control.
+
+Every route handler is a sync ``def``, so each request occupies one
+thread of AnyIO's default threadpool while it holds one pooled database
+connection. The threadpool is therefore sized to the connection pool:
+``THREADPOOL_TOKENS``, or ``DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW``
+when unset.
+
+``AdmissionMiddleware`` lets at most that many requests in at once.
+Requests beyond it wait in a queue, and a request that waits longer than
+``ADMISSION_MAX_WAIT_SECONDS`` is answered right away with 503 instead of
+queueing invisibly until the client gives up. Queue depth and wait times
+are exposed in ``GET /metrics`` under ``admission``.
+"""
+
+import json
+import threading
+import time
+from http import HTTPStatus
+
+import anyio
+
+from madrproject.config.metrics import metrics
+from madrproject.config.settings import settings
+
+
+def threadpool_tokens() -> int:
+    """
+    Returns the number of worker threads, and of concurrent requests.
+
+    Returns:
+        int: ``THREADPOOL_TOKENS`` if set, otherwise the maximum number of
+        connections the database pool hands out.
+    """
+    return settings.THREADPOOL_TOKENS or (
+        settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW
+    )
+
+
+class AdmissionStats:
+    """
+    Queue depth and wait times of the admission controller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def enqueue(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def dequeue(self, wait: float, admitted: bool) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.max_wait = max(self.max_wait, wait)
+            if admitted:
+                self.admitted += 1
+                self.in_flight += 1
+                self.total_wait += wait
+            else:
+                self.rejected += 1
+
+    def finish(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'waiting': self.waiting,
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'mean_wait_seconds': (
+                    self.total_wait / self.admitted if self.admitted else 0.0
+                ),
+                'max_wait_seconds': self.max_wait,
+            }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware bounding the number of requests handled at once and
+    shedding the ones that wait too long for a slot.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrency: int,
+        max_wait: float,
+        exempt_paths: set[str] = frozenset(),
+    ):
+        self.app = app
+        self.max_wait = max_wait
+        self.exempt_paths = exempt_paths
+        self.limiter = anyio.CapacityLimiter(max_concurrency)
+        self.stats = AdmissionStats()
+
+        metrics.register_collector('admission', self.stats.snapshot)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        self.stats.enqueue()
+        admitted = False
+        try:
+            with anyio.move_on_after(self.max_wait):
+                await self.limiter.acquire()
+                admitted = True
+        finally:
+            self.stats.dequeue(time.monotonic() - started, admitted)
+
+        if not admitted:
+            await self._reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+            self.stats.finish()
+
+    @staticmethod
+    async def _reject(send):
+        content = json.dumps({
+            'detail': 'The server is busy, try again later.'
+        }).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': HTTPStatus.SERVICE_UNAVAILABLE,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(content)).encode()),
+                (b'retry-after', b'1'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': content})
@@ -0,0 +1,283 @@
+"""
+In-memory prefix indexes for search-as-you-type.
+
+A ``PrefixIndex`` keeps one text column of a model as a sorted list of
+``(normalized text, id)`` pairs, so a prefix lookup is a binary search and
+a short slice instead of a ``LIKE`` scan of the table; the original texts
+are kept by id, so matches are returned as stored. Indexes are loaded
+from the database at startup (or on their first lookup) and then kept
+up to date from the ORM: rows flushed by a session are collected and
+applied when that session commits, so rolled-back writes never show up.
+
+Each worker keeps its own copy, so the writes made by other workers are
+picked up from the change feed: ``catch_up`` reads the rows and the
+tombstones whose change sequence number is past the last one the index
+has seen. The application runs it every ``AUTOCOMPLETE_REFRESH_SECONDS``,
+which bounds how stale an index can be. The number of entries is capped;
+once a table outgrows the cap, the index stops being authoritative and
+lookups are answered by a ``LIKE 'prefix%'`` query instead.
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from madrproject.changes.models import Tombstone
+from madrproject.changes.sequence import committed_position
+from madrproject.config.metrics import metrics
+
+PENDING_KEY = 'autocomplete_pending'
+
+indexes: dict[type, 'PrefixIndex'] = {}
+
+
+class PrefixIndex:
+    """
+    Sorted index of one text column supporting prefix lookups.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: type,
+        attribute: str,
+        entity: str,
+        max_entries: int,
+    ):
+        self.name = name
+        self.model = model
+        self.attribute = attribute
+        self.entity = entity
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: list[tuple[str, int]] = []
+        self._texts: dict[int, str] = {}
+        self.position = 0
+        self.loaded = False
+        self.complete = True
+
+        indexes[model] = self
+        metrics.register_collector(f'autocomplete_{name}', self.stats)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.casefold()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'complete': self.complete,
+                'entries': len(self._entries),
+                'position': self.position,
+            }
+
+    def load(self, session: Session) -> None:
+        """
+        Rebuilds the index from the database.
+
+        The table is read without holding the index lock, so lookups keep
+        being served from the previous copy meanwhile. The change
+        sequence number is read first: a commit that lands while the
+        table is being read is picked up by the next ``catch_up``.
+
+        Args:
+            session (Session): Session used to read the table.
+        """
+        column = getattr(self.model, self.attribute)
+        position = committed_position(session)
+        rows = session.execute(
+            select(self.model.id, column).limit(self.max_entries + 1)
+        ).all()
+
+        texts = dict(rows[: self.max_entries])
+        entries = sorted(
+            (self.normalize(text), row_id) for row_id, text in texts.items()
+        )
+
+        with self._lock:
+            self.complete = len(rows) <= self.max_entries
+            self._texts = texts
+            self._entries = entries
+            self.position = position
+            self.loaded = True
+
+    def catch_up(self, session: Session) -> None:
+        """
+        Applies the changes committed since the index was last brought
+        up to date, including those made by other workers.
+
+        Args:
+            session (Session): Session used to read the change feed.
+        """
+        if not self.loaded:
+            return
+
+        since = self.position
+        position = committed_position(session)
+        if position <= since:
+            return
+
+        column = getattr(self.model, self.attribute)
+        changed = session.execute(
+            select(self.model.change_seq, self.model.id, column).where(
+                self.model.change_seq > since,
+                self.model.change_seq <= position,
+            )
+        ).all()
+        deleted = session.execute(
+            select(Tombstone.change_seq, Tombstone.entity_id, None).where(
+                Tombstone.entity == self.entity,
+                Tombstone.change_seq > since,
+                Tombstone.change_seq <= position,
+            )
+        ).all()
+
+        changes = sorted([*changed, *deleted], key=lambda row: row[0])
+        self.apply([(row_id, text) for _, row_id, text in changes])
+        with self._lock:
+            self.position = max(self.position, position)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = []
+            self._texts = {}
+            self.loaded = False
+            self.complete = True
+
+    def _remove(self, row_id: int) -> None:
+        text = self._texts.pop(row_id, None)
+        if text is None:
+            return
+
+        position = bisect_left(self._entries, (self.normalize(text), row_id))
+        del self._entries[position]
+
+    def apply(self, changes: list[tuple[int, str | None]]) -> None:
+        """
+        Applies committed changes; a text of None means a deleted row.
+
+        Args:
+            changes (list): ``(id, text)`` pairs in commit order.
+        """
+        with self._lock:
+            if not self.loaded:
+                return
+
+            for row_id, text in changes:
+                self._remove(row_id)
+                if text is None:
+                    continue
+
+                if len(self._entries) >= self.max_entries:
+                    self.complete = False
+                    continue
+
+                self._texts[row_id] = text
+                insort(self._entries, (self.normalize(text), row_id))
+
+    def search(
+        self, session: Session, prefix: str, limit: int
+    ) -> list[tuple[int, str]]:
+        """
+        Returns the rows whose text starts with ``prefix``, in order.
+
+        Args:
+            session (Session): Session used to load the index on first
+                use, or to query the table when the index is incomplete.
+            prefix (str): Beginning of the text, case-insensitive.
+            limit (int): Maximum number of rows to return.
+
+        Returns:
+            list[tuple[int, str]]: ``(id, text)`` pairs.
+        """
+        if not self.loaded:
+            self.load(session)
+
+        prefix = self.normalize(prefix)
+
+        if not self.complete:
+            column = getattr(self.model, self.attribute)
+            return [
+                tuple(row)
+                for row in session.execute(
+                    select(self.model.id, column)
+                    .where(column.startswith(prefix, autoescape=True))
+                    .order_by(column, self.model.id)
+                    .limit(limit)
+                )
+            ]
+
+        with self._lock:
+            start = bisect_left(self._entries, (prefix,))
+            matches = []
+            for normalized, row_id in self._entries[start : start + limit]:
+                if not normalized.startswith(prefix):
+                    break
+                matches.append((row_id, self._texts[row_id]))
+            return matches
+
+
+def load_indexes(engine: Engine) -> None:
+    """
+    Loads every prefix index, typically at application startup.
+
+    Args:
+        engine (Engine): Engine of the application database.
+    """
+    with Session(engine) as session:
+        for index in indexes.values():
+            index.load(session)
+
+
+def catch_up_indexes(engine: Engine) -> None:
+    """
+    Brings every loaded prefix index up to date with the change feed.
+
+    Args:
+        engine (Engine): Engine of the application database.
+    """
+    with Session(engine) as session:
+        for index in indexes.values():
+            index.catch_up(session)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault(PENDING_KEY, [])
+
+    for instance in session.new | session.dirty:
+        index = indexes.get(type(instance))
+        if index is not None:
+            pending.append((
+                index,
+                instance.id,
+                getattr(instance, index.attribute),
+            ))
+
+    for instance in session.deleted:
+        index = indexes.get(type(instance))
+        if index is not None:
+            pending.append((index, instance.id, None))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_changes(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+
+    changes: dict[PrefixIndex, list] = {}
+    for index, row_id, text in pending:
+        changes.setdefault(index, []).append((row_id, text))
+
+    for index, index_changes in changes.items():
+        index.apply(index_changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,136 @@
+"""
+Single-flight coalescing of identical in-flight reads.
+
+When several requests ask for the same key at the same time, the first one
+(the leader) runs the query and serializes the response while the others
+wait for it and reuse its bytes. A follower waits at most ``timeout``
+seconds; after that it stops waiting and runs the query itself, so a slow
+leader cannot stall the followers indefinitely.
+
+Per-key outcomes are published in ``/metrics``, so keys are reported by
+their kind and a short hash: the key holds the request's parameters,
+search terms included, which must not leak to whoever reads the metrics.
+"""
+
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+from madrproject.config.metrics import metrics
+
+T = TypeVar('T')
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+def key_label(key: Hashable) -> str:
+    """
+    Returns the label a key's stats are published under.
+
+    Args:
+        key (Hashable): Key of the read, usually ``(kind, parameters)``.
+
+    Returns:
+        str: The kind of the key and a short hash of the whole key, such
+        as ``list:1f0c9a2b7d3e``.
+    """
+    kind = key[0] if isinstance(key, tuple) and key else 'key'
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=6).hexdigest()
+    return f'{kind}:{digest}'
+
+
+class SingleFlight:
+    """
+    Shares one execution of ``fn`` between concurrent callers of a key.
+    """
+
+    def __init__(self, name: str, timeout: float, max_tracked_keys: int = 500):
+        self.name = name
+        self.timeout = timeout
+        self.max_tracked_keys = max_tracked_keys
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._key_stats: OrderedDict[str, Counter] = OrderedDict()
+
+        metrics.register_collector(f'coalescing_{name}', self.stats)
+
+    def _record(self, key: Hashable, outcome: str) -> None:
+        metrics.increment(
+            'coalesced_requests_total', group=self.name, outcome=outcome
+        )
+
+        label = key_label(key)
+        with self._lock:
+            stats = self._key_stats.pop(label, None) or Counter()
+            stats[outcome] += 1
+            self._key_stats[label] = stats
+            if len(self._key_stats) > self.max_tracked_keys:
+                self._key_stats.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Returns the in-flight count and the outcomes of recent keys.
+
+        Returns:
+            dict: Number of keys being computed and, for the most
+            recently used keys (by label), how many callers led, shared
+            or timed out.
+        """
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'keys': {
+                    key: dict(stats) for key, stats in self._key_stats.items()
+                },
+            }
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Runs ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key (Hashable): Identity of the read, including every
+                parameter that changes its result.
+            fn (Callable): Function performing the read and returning the
+                serialized response, possibly with metadata such as its
+                version.
+
+        Raises:
+            Exception: Whatever ``fn`` raised in the leader.
+
+        Returns:
+            The value returned by ``fn``.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if is_leader:
+            try:
+                call.result = fn()
+            except BaseException as error:
+                call.error = error
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+                self._record(key, 'leader')
+            return call.result
+
+        if not call.done.wait(self.timeout):
+            self._record(key, 'timeout')
+            return fn()
+
+        self._record(key, 'shared')
+        if call.error is not None:
+            raise call.error
+        return call.result
@@ -0,0 +1,258 @@
+"""
+Response compression negotiated through ``Accept-Encoding``.
+
+gzip is always available; zstd and brotli are offered when the optional
+``zstandard`` and ``brotli`` packages are installed, and preferred over
+gzip in that order when the client accepts them.
+
+Responses smaller than the minimum size, responses that are already
+encoded and the excluded paths (the small, hot auth responses) are sent
+untouched. A streamed response without a length is buffered until it
+reaches the minimum size, and sent untouched if it ends before that;
+past it, it is compressed chunk by chunk and flushed after every chunk,
+so the client receives data as soon as the app sends it. Bodies or
+chunks larger than ``offload_size`` are compressed in a worker thread
+instead of on the event loop.
+
+A compressed body is a different representation from the identity one,
+so a strong ``ETag`` is suffixed with the encoding (``"3"`` becomes
+``"3-gzip"``) and stays strong; ``If-Match`` accepts the suffixed tags
+and still compares strongly. Weak tags are sent unchanged.
+"""
+
+import zlib
+
+import anyio
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# Every encoding the middleware can produce, whatever is installed.
+ENCODINGS = ('zstd', 'br', 'gzip')
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def available_encoders() -> dict[str, tuple[type, int]]:
+    """
+    Returns the encoders this process can use, most preferred first,
+    with the level each one runs at.
+    """
+    encoders = {}
+    if zstandard is not None:
+        encoders['zstd'] = (ZstdEncoder, 3)
+    if brotli is not None:
+        encoders['br'] = (BrotliEncoder, 4)
+    encoders['gzip'] = (GzipEncoder, 6)
+    return encoders
+
+
+def negotiate(accept_encoding: str, supported: list[str]) -> str | None:
+    """
+    Picks the encoding to use for a request.
+
+    Args:
+        accept_encoding (str): Value of the Accept-Encoding header.
+        supported (list[str]): Encodings the server offers, most
+            preferred first.
+
+    Returns:
+        str | None: The chosen encoding, or None to send the body as is.
+    """
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in supported:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses the client can decode.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int,
+        offload_size: int,
+        excluded_paths: set[str] = frozenset(),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.excluded_paths = excluded_paths
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = dict(scope['headers']).get(b'accept-encoding', b'')
+        encoding = negotiate(
+            accept_encoding.decode('latin-1'), [*self.encoders]
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    async def run(self, function, data: bytes) -> bytes:
+        if len(data) >= self.offload_size:
+            return await anyio.to_thread.run_sync(function, data)
+        return function(data)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+        self.buffered = b''
+
+    def _new_encoder(self):
+        encoder_class, level = self.middleware.encoders[self.encoding]
+        return encoder_class(level)
+
+    def _etag(self, value: bytes) -> bytes:
+        if value.startswith(b'W/') or not value.endswith(b'"'):
+            return value
+        return value[:-1] + b'-' + self.encoding.encode() + b'"'
+
+    def _headers(self, compressed: bytes | None) -> list:
+        headers = [
+            (name, self._etag(value) if name.lower() == b'etag' else value)
+            for name, value in self.start_message.get('headers', [])
+            if name.lower() != b'content-length'
+        ]
+        headers.append((b'content-encoding', self.encoding.encode()))
+        headers.append((b'vary', b'Accept-Encoding'))
+        if compressed is not None:
+            headers.append((b'content-length', str(len(compressed)).encode()))
+        return headers
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            headers = dict(message.get('headers', []))
+            length = headers.get(b'content-length')
+            self.start_message = message
+            self.passthrough = b'content-encoding' in headers or (
+                length is not None
+                and int(length) < self.middleware.minimum_size
+            )
+            if self.passthrough:
+                await self.downstream(message)
+            return
+
+        if message['type'] != 'http.response.body' or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.encoder is None:
+            self.buffered += body
+            if more_body and len(self.buffered) < self.middleware.minimum_size:
+                return
+
+            body, self.buffered = self.buffered, b''
+            if not more_body:
+                await self._send_whole(body)
+                return
+
+            self.encoder = self._new_encoder()
+            await self.downstream({
+                **self.start_message,
+                'headers': self._headers(compressed=None),
+            })
+
+        chunk = await self.middleware.run(self.encoder.compress, body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        await self.downstream({
+            'type': 'http.response.body',
+            'body': chunk,
+            'more_body': more_body,
+        })
+
+    async def _send_whole(self, body: bytes):
+        if len(body) < self.middleware.minimum_size:
+            await self.downstream(self.start_message)
+            await self.downstream({'type': 'http.response.body', 'body': body})
+            return
+
+        encoder = self._new_encoder()
+        compressed = await self.middleware.run(
+            lambda data: encoder.compress(data) + encoder.finish(), body
+        )
+        await self.downstream({
+            **self.start_message,
+            'headers': self._headers(compressed),
+        })
+        await self.downstream({
+            'type': 'http.response.body',
+            'body': compressed,
+        })
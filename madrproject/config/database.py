@@ -1,17 +1,133 @@
-from sqlalchemy import create_engine
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, registry
+from sqlalchemy.sql.dml import UpdateBase
 
 from .settings import settings
+from .sqlite import install_sqlite_profile, is_sqlite, is_sqlite_file
+from .timeouts import (
+    install_statement_timeouts,
+    set_statement_timeout,
+    statement_timeout_for,
+)
 
 mapper_registry = registry()
 metadata = mapper_registry.metadata
 
+WRITER_KEY = 'uses_writer'
+
+
+def pool_options(url: str) -> dict:
+    """
+    Returns the connection pool sizing for the database URL.
+
+    In-memory SQLite keeps one connection per thread and takes no pool
+    size, so it is left to SQLAlchemy's defaults.
+    """
+    if is_sqlite(url) and not is_sqlite_file(url):
+        return {}
+
+    return {
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+    }
+
+
+def create_writer_engine(url: str) -> Engine | None:
+    """
+    Creates the engine holding the single writer connection of an SQLite
+    file database, or returns None for databases that take concurrent
+    writers.
+
+    A writer waits for the connection as long as SQLite itself would
+    wait for the lock.
+    """
+    if not is_sqlite_file(url):
+        return None
+
+    return create_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+    )
+
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    echo=settings.DATABASE_ECHO,
+    **pool_options(settings.DATABASE_URL),
+)
+writer_engine = create_writer_engine(settings.DATABASE_URL) or engine
+
+install_sqlite_profile(engine)
+install_statement_timeouts(engine)
+if writer_engine is not engine:
+    install_sqlite_profile(writer_engine)
+    install_statement_timeouts(writer_engine)
+
+mapper_registry.metadata.create_all(writer_engine)
+
+
+class RoutingSession(Session):
+    """
+    Session reading through ``engine`` and writing through
+    ``writer_engine``.
+
+    From its first write until the end of the transaction, the session
+    reads through the writer as well, so it sees its own changes.
+    """
+
+    def __init__(
+        self,
+        reader: Engine | None = None,
+        writer: Engine | None = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            reader (Engine | None): Engine for reads, ``engine`` by
+                default.
+            writer (Engine | None): Engine for writes, ``writer_engine``
+                by default.
+            **kwargs: Passed on to ``Session``.
+        """
+        super().__init__(**kwargs)
+        self.reader = reader or engine
+        self.writer = writer or writer_engine
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writer is self.reader:
+            return self.reader
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info[WRITER_KEY] = True
+        return self.writer if self.info.get(WRITER_KEY) else self.reader
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+@event.listens_for(RoutingSession, 'after_rollback')
+def _release_writer(session):
+    session.info.pop(WRITER_KEY, None)
+
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+def utcnow() -> datetime:
+    """
+    Python-side clock for change-tracking columns.
 
-mapper_registry.metadata.create_all(engine)
+    Timestamps are generated by the application rather than the database
+    so they keep sub-second precision on every backend, which the change
+    feed cursors depend on.
+    """
+    return datetime.now(tz=ZoneInfo('UTC')).replace(tzinfo=None)
 
 
-def get_session():
-    with Session(engine) as session:
+def get_session(request: Request):
+    with RoutingSession() as session:
+        set_statement_timeout(session, statement_timeout_for(request))
         yield session
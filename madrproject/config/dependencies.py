@@ -1,6 +1,13 @@
-# from madrproject.config.security import get_current_user
+from typing import Annotated
 
+from fastapi import Depends
+from sqlalchemy.orm import Session
 
-# T_CurrentUser = Annotated[Account, Depends(get_current_user())]
-# T_Session = Annotated[Session, Depends(get_session())]
-# T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
+from madrproject.accounts.models import Account
+from madrproject.config.concurrency import Precondition
+from madrproject.config.database import get_session
+from madrproject.config.security import get_current_account
+
+T_CurrentAccount = Annotated[Account, Depends(get_current_account)]
+T_Session = Annotated[Session, Depends(get_session)]
+T_Precondition = Annotated[Precondition, Depends()]
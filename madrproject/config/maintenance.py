@@ -0,0 +1,122 @@
+"""
+Periodic housekeeping of the shared tables and per-process caches.
+
+Jobs are registered once with the interval they should run at, and a
+background thread started with the application runs each one when it is
+due. Every worker runs its own copy of the jobs, so they must be safe to
+run concurrently, like deleting expired rows. A failing job is logged,
+counted in ``maintenance_runs_total`` and retried at its next interval.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from madrproject.config.metrics import metrics
+
+logger = logging.getLogger('madrproject.maintenance')
+
+# Longest the thread sleeps, so newly registered jobs are picked up.
+MAX_SLEEP = 60.0
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float
+    run: Callable[[], object]
+    due_at: float = 0.0
+
+
+class Maintenance:
+    """
+    Registry of periodic jobs and the thread running them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(
+        self, name: str, interval: float, run: Callable[[], object]
+    ) -> None:
+        """
+        Schedules a job, replacing any job registered under the same name.
+
+        Args:
+            name (str): Name of the job, used in logs and metrics.
+            interval (float): Seconds between two runs.
+            run (Callable): Function doing the work, without arguments.
+        """
+        with self._lock:
+            self._jobs[name] = Job(
+                name, interval, run, due_at=time.monotonic() + interval
+            )
+
+    def run_pending(self) -> float:
+        """
+        Runs every job that is due.
+
+        Returns:
+            float: Seconds until the next job is due.
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [job for job in self._jobs.values() if job.due_at <= now]
+
+        for job in due:
+            try:
+                job.run()
+            except Exception:
+                metrics.increment(
+                    'maintenance_runs_total', job=job.name, outcome='failed'
+                )
+                logger.exception('Maintenance job %s failed', job.name)
+            else:
+                metrics.increment(
+                    'maintenance_runs_total', job=job.name, outcome='done'
+                )
+            job.due_at = time.monotonic() + job.interval
+
+        with self._lock:
+            next_due = min(
+                (job.due_at for job in self._jobs.values()),
+                default=now + MAX_SLEEP,
+            )
+        return min(max(next_due - time.monotonic(), 0), MAX_SLEEP)
+
+    def start(self) -> None:
+        """
+        Starts running the jobs in the background.
+        """
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='maintenance', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread once the running job has finished.
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        delay = self.run_pending()
+        while not self._stopped.wait(delay):
+            delay = self.run_pending()
+
+
+maintenance = Maintenance()
@@ -0,0 +1,71 @@
+"""
+In-process counters exposed by ``GET /metrics``.
+"""
+
+import threading
+from collections import Counter
+from typing import Callable
+
+
+class Metrics:
+    """
+    Thread-safe registry of named counters with optional labels.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Counter[tuple] = Counter()
+        self._collectors: dict[str, Callable[[], object]] = {}
+
+    def increment(self, name: str, amount: int = 1, **labels: str) -> None:
+        """
+        Adds ``amount`` to the counter identified by name and labels.
+
+        Args:
+            name (str): Counter name.
+            amount (int): Value to add. Default is 1.
+            **labels (str): Label values distinguishing the series.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def register_collector(
+        self, name: str, collect: Callable[[], object]
+    ) -> None:
+        """
+        Adds a value computed on demand to every snapshot.
+
+        Args:
+            name (str): Key of the value in the snapshot.
+            collect (Callable): Function returning a JSON-serializable
+                value when the snapshot is taken.
+        """
+        with self._lock:
+            self._collectors[name] = collect
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current value of every counter and collector.
+
+        Returns:
+            dict: Counter name mapped to a list of label sets and values,
+            plus one entry per registered collector.
+        """
+        with self._lock:
+            counters = list(self._counters.items())
+            collectors = list(self._collectors.items())
+
+        result: dict[str, object] = {}
+        for (name, labels), value in sorted(counters):
+            result.setdefault(name, []).append({
+                'labels': dict(labels),
+                'value': value,
+            })
+
+        for name, collect in collectors:
+            result[name] = collect()
+        return result
+
+
+metrics = Metrics()
@@ -0,0 +1,416 @@
+"""
+On-demand profiling of single requests.
+
+When ``PROFILING_ENABLED`` is set, ``ProfilingMiddleware`` is installed on
+the app. A request carrying a valid ``X-Profile`` trigger is profiled
+with a sampling profiler and every SQL statement it issues is timed; the
+report is written as JSON to ``PROFILING_OUTPUT_DIR`` and its file name
+is returned in the ``X-Profile-Report`` response header. Requests without
+the header only pay for one header lookup.
+
+``PROFILING_TOKEN`` is never sent itself: it signs short-lived triggers
+of the form ``<expires>.<hmac>``, which an operator issues with::
+
+    python -m madrproject.config.profiling --ttl 300
+
+so a trigger that leaks into logs stops working once it expires.
+
+The sync route handlers run in threadpool threads rather than on the
+event loop. The sampler only records the threads working for the
+profiled request: the event loop while the request's task is running,
+and the threadpool threads that registered themselves with the profile.
+``profile_thread`` wraps a sync function so that, called in a profiled
+request's context, it registers its thread for the duration of the call;
+``instrument_routes`` applies it to every sync route of the app. Other
+requests served concurrently are left out.
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable
+
+import anyio
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from madrproject.config.settings import settings
+
+PROFILE_HEADER = b'x-profile'
+REPORT_HEADER = b'x-profile-report'
+TOP_FUNCTIONS = 30
+# Longest lifetime accepted for a trigger, in seconds.
+MAX_TRIGGER_TTL = 60 * 60
+QUERY_START_KEY = 'profile_query_start'
+
+# Innermost frames of threads that are parked waiting for work.
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('queue.py', 'get'),
+    ('selectors.py', 'select'),
+}
+
+current_profile: ContextVar['RequestProfile | None'] = ContextVar(
+    'current_profile', default=None
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+def issue_trigger(secret: str, ttl: float) -> str:
+    """
+    Signs a profiling trigger for the ``X-Profile`` header.
+
+    Args:
+        secret (str): The ``PROFILING_TOKEN`` of the application.
+        ttl (float): Seconds the trigger stays valid.
+
+    Returns:
+        str: Header value of the form ``<expires>.<hmac>``.
+    """
+    expires = str(int(time.time() + ttl))
+    return f'{expires}.{_signature(secret.encode(), expires.encode())}'
+
+
+def _signature(secret: bytes, expires: bytes) -> str:
+    return hmac.new(secret, expires, hashlib.sha256).hexdigest()
+
+
+class StackSampler(threading.Thread):
+    """
+    Background thread that periodically records the stacks of the
+    threads selected by ``is_sampled``.
+    """
+
+    def __init__(
+        self, interval: float, is_sampled: Callable[[int, object], bool]
+    ):
+        super().__init__(name='request-profiler', daemon=True)
+        self.interval = interval
+        self.is_sampled = is_sampled
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._finished = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+
+        while not self._finished.wait(self.interval):
+            for thread_id, top_frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                code = top_frame.f_code
+                filename = os.path.basename(code.co_filename)
+                if (filename, code.co_name) in IDLE_FRAMES:
+                    continue
+                if not self.is_sampled(thread_id, top_frame):
+                    continue
+
+                stack = []
+                frame = top_frame
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._finished.set()
+        self.join()
+
+
+class RequestProfile:
+    """
+    Samples and SQL timings collected for one profiled request.
+    """
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.method = method
+        self.path = path
+        self.status_code: int | None = None
+        self.queries: list[dict] = []
+        self.sampler = StackSampler(interval, self._works_for_request)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._threads: set[int] = set()
+        self._started_at = 0.0
+        self.elapsed = 0.0
+
+    def start(self) -> None:
+        """
+        Starts sampling; called from the request's task on the loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.current_task()
+        self._started_at = time.perf_counter()
+        self.sampler.start()
+
+    def _works_for_request(self, thread_id: int, frame) -> bool:
+        if thread_id == self._loop_thread_id:
+            return asyncio.current_task(self._loop) is self._task
+        return thread_id in self._threads
+
+    def stop(self) -> None:
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self._started_at
+
+    def report(self) -> dict:
+        """
+        Aggregates the raw samples into a JSON-serializable report.
+
+        Returns:
+            dict: Request summary, hottest functions by self and
+            cumulative samples, folded stacks and per-query SQL timings.
+        """
+        stacks = self.sampler.stacks
+        total = sum(stacks.values()) or 1
+        own: Counter[str] = Counter()
+        cumulative: Counter[str] = Counter()
+
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                cumulative[label] += count
+
+        def top(counter: Counter) -> list[dict]:
+            return [
+                {
+                    'function': label,
+                    'samples': count,
+                    'percent': round(100 * count / total, 2),
+                }
+                for label, count in counter.most_common(TOP_FUNCTIONS)
+            ]
+
+        return {
+            'method': self.method,
+            'path': self.path,
+            'status_code': self.status_code,
+            'elapsed_ms': round(self.elapsed * 1000, 3),
+            'interval_ms': self.sampler.interval * 1000,
+            'samples': self.sampler.samples,
+            'sql': {
+                'count': len(self.queries),
+                'total_ms': round(
+                    sum(query['duration_ms'] for query in self.queries), 3
+                ),
+                'queries': self.queries,
+            },
+            'self': top(own),
+            'cumulative': top(cumulative),
+            'folded': [
+                f'{";".join(stack)} {count}'
+                for stack, count in stacks.most_common()
+            ],
+        }
+
+
+def profile_thread(function: Callable) -> Callable:
+    """
+    Wraps a sync function so the thread running it is sampled while it
+    works for a profiled request.
+
+    Args:
+        function (Callable): Function run in a threadpool thread, with
+            the request's context copied into it.
+
+    Returns:
+        Callable: The wrapped function, with the same signature.
+    """
+
+    @functools.wraps(function)
+    def run(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return function(*args, **kwargs)
+
+        thread_id = threading.get_ident()
+        profile._threads.add(thread_id)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile._threads.discard(thread_id)
+
+    return run
+
+
+def instrument_routes(app) -> None:
+    """
+    Registers the thread of every sync route handler with the profile of
+    the request it serves.
+
+    Args:
+        app (FastAPI): Application whose routes are already included.
+    """
+    for route in app.routes:
+        dependant = getattr(route, 'dependant', None)
+        if dependant is None or asyncio.iscoroutinefunction(dependant.call):
+            continue
+        dependant.call = profile_thread(dependant.call)
+
+
+# A connection runs one statement at a time, so its start time is kept
+# in the connection info until the statement completes or fails.
+
+
+def _before_cursor_execute(conn, cursor, statement, *args):
+    if current_profile.get() is not None:
+        conn.info[QUERY_START_KEY] = time.perf_counter()
+
+
+def _record_query(profile, conn, statement: str, **details) -> None:
+    started_at = conn.info.pop(QUERY_START_KEY, None)
+    if profile is None or started_at is None:
+        return
+
+    profile.queries.append({
+        'statement': statement,
+        'duration_ms': round((time.perf_counter() - started_at) * 1000, 3),
+        **details,
+    })
+
+
+def _after_cursor_execute(conn, cursor, statement, *args):
+    _record_query(current_profile.get(), conn, statement)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None:
+        _record_query(
+            current_profile.get(),
+            conn,
+            exception_context.statement,
+            error=type(exception_context.original_exception).__name__,
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Times the statements issued by profiled requests on the engine.
+
+    Args:
+        engine (Engine): Engine whose cursor executions are timed.
+    """
+    if not event.contains(
+        engine, 'before_cursor_execute', _before_cursor_execute
+    ):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests carrying a valid trigger.
+    """
+
+    def __init__(
+        self,
+        app,
+        token: str | None,
+        output_dir: str,
+        interval_ms: float = 1.0,
+    ):
+        if not token:
+            raise ValueError('PROFILING_TOKEN must be set to enable profiling')
+
+        self.app = app
+        self.token = token.encode()
+        self.output_dir = output_dir
+        self.interval = interval_ms / 1000
+
+    def _is_triggered(self, scope) -> bool:
+        for name, value in scope['headers']:
+            if name == PROFILE_HEADER:
+                return self._is_valid_trigger(value)
+        return False
+
+    def _is_valid_trigger(self, value: bytes) -> bool:
+        expires, _, signature = value.partition(b'.')
+        if not expires.isdigit():
+            return False
+
+        remaining = int(expires) - time.time()
+        if not 0 < remaining <= MAX_TRIGGER_TTL:
+            return False
+        return hmac.compare_digest(
+            signature, _signature(self.token, expires).encode()
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._is_triggered(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope['method'], scope['path'], self.interval)
+        report_name = f'{time.strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex}'
+
+        async def send_with_report(message):
+            if message['type'] == 'http.response.start':
+                profile.status_code = message['status']
+                message['headers'] = [
+                    *message.get('headers', []),
+                    (REPORT_HEADER, f'{report_name}.json'.encode()),
+                ]
+            await send(message)
+
+        token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_report)
+        finally:
+            profile.stop()
+            current_profile.reset(token)
+            await anyio.to_thread.run_sync(
+                self._write_report, report_name, profile.report()
+            )
+
+    def _write_report(self, report_name: str, report: dict) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f'{report_name}.json')
+        with open(path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Issue an X-Profile header value to profile a request.'
+    )
+    parser.add_argument(
+        '--ttl',
+        type=int,
+        default=300,
+        help='seconds the trigger stays valid (at most one hour)',
+    )
+    args = parser.parse_args(argv)
+
+    if not settings.PROFILING_TOKEN:
+        print('PROFILING_TOKEN is not set.', file=sys.stderr)
+        return 1
+
+    print(
+        issue_trigger(settings.PROFILING_TOKEN, min(args.ttl, MAX_TRIGGER_TTL))
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
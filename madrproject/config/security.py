@@ -1,22 +1,80 @@
+import hashlib
+import hmac
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from http import HTTPStatus
+from typing import Annotated
 from zoneinfo import ZoneInfo
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
-from jwt.exceptions import ExpiredSignatureError, PyJWTError
+from jwt.exceptions import PyJWTError
 from pwdlib import PasswordHash
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from madrproject.accounts.models import Account
+from madrproject.audit.log import set_actor
 from madrproject.config.database import get_session
+from madrproject.config.metrics import metrics
 from madrproject.config.settings import settings
+from madrproject.config.statements import ACCOUNT_BY_EMAIL
 
 pwd_context = PasswordHash.recommended()
 oauth2_schema = OAuth2PasswordBearer(tokenUrl='auth/token')
 
+REFRESH_TOKEN_TYPE = 'refresh'
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of access tokens whose signature was already verified.
+
+    Entries are keyed by a digest of the token, so the cache never holds
+    usable credentials, and are dropped once the token expires.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> str | None:
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            subject, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return subject
+
+    def put(self, token: str, subject: str, expires_at: float) -> None:
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (subject, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
 
 def get_password_hash(password: str):
     return pwd_context.hash(password)
@@ -42,33 +100,102 @@ def create_access_token(data_payload: dict):
     return encoded_jwt
 
 
-def get_current_account(
-    session: Session = Depends(get_session),
-    token=Depends(oauth2_schema),
-):
-    credentials_exception = HTTPException(
+def create_refresh_token(subject: str) -> str:
+    """
+    Creates a long-lived token that can only be exchanged for new tokens.
+
+    Args:
+        subject (str): Email of the account.
+
+    Returns:
+        str: The encoded refresh token.
+    """
+    expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
+        days=settings.REFRESH_TOKEN_EXPIRES_DAYS
+    )
+
+    return encode(
+        {
+            'sub': subject,
+            'exp': expire,
+            'jti': uuid.uuid4().hex,
+            'typ': REFRESH_TOKEN_TYPE,
+        },
+        key=settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verifies a token's signature and expiration and returns its claims.
+
+    Raises:
+        HTTPException: If the token is invalid or expired.
+    """
+    try:
+        payload = decode(token, settings.SECRET_KEY, settings.ALGORITHM)
+    except PyJWTError:
+        raise credentials_exception()
+
+    if not payload.get('sub'):
+        raise credentials_exception()
+    return payload
+
+
+def require_metrics_token(
+    authorization: Annotated[str | None, Header()] = None,
+) -> None:
+    """
+    Admits a scraper presenting ``Bearer <METRICS_TOKEN>``.
+
+    The metrics describe the worker's internals (queues, pools, caches),
+    so they are never public: without a configured token nobody gets in.
+
+    Raises:
+        HTTPException: 401 if the token is missing or does not match.
+    """
+    expected = settings.METRICS_TOKEN
+    if (
+        expected is None
+        or authorization is None
+        or not hmac.compare_digest(
+            authorization.encode(), f'Bearer {expected}'.encode()
+        )
+    ):
+        raise credentials_exception()
+
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
-    try:
-        payload = decode(token, settings.SECRET_KEY, settings.ALGORITHM)
-        username: str = payload.get('sub')
 
-        if not username:
-            raise credentials_exception
 
-    except ExpiredSignatureError:
-        raise credentials_exception
+def get_current_account(
+    session: Session = Depends(get_session),
+    token=Depends(oauth2_schema),
+):
+    username = verified_tokens.get(token)
 
-    except PyJWTError:
-        raise credentials_exception
+    if username is None:
+        metrics.increment('verified_token_cache_total', outcome='miss')
+        payload = decode_token(token)
 
-    account_db = session.scalar(
-        select(Account).where(Account.email == username)
-    )
+        if payload.get('typ') == REFRESH_TOKEN_TYPE:
+            raise credentials_exception()
+
+        username = payload['sub']
+        verified_tokens.put(token, username, payload['exp'])
+    else:
+        metrics.increment('verified_token_cache_total', outcome='hit')
+
+    account_db = session.scalar(ACCOUNT_BY_EMAIL, {'email': username})
 
     if account_db is None:
-        raise credentials_exception
+        raise credentials_exception()
 
+    set_actor(session, account_db.id)
     return account_db
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,59 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRES_MINUTES: int
+    REFRESH_TOKEN_EXPIRES_DAYS: int = 30
+    TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+    REVOCATION_PURGE_INTERVAL_SECONDS: int = 60 * 60
+    DATABASE_ECHO: bool = True
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    SQLITE_BUSY_TIMEOUT_MS: int = 5_000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
+    THREADPOOL_TOKENS: int | None = None
+    ADMISSION_MAX_WAIT_SECONDS: float = 0.5
+    WARM_UP_ON_STARTUP: bool = True
+    WARM_UP_CONNECTIONS: int = 2
+    READINESS_CACHE_SECONDS: float = 2.0
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024
+    WEB_HOST: str = '0.0.0.0'
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int | None = None
+    WEB_BACKLOG: int = 2048
+    WEB_GRACEFUL_TIMEOUT: int = 30
+    LOGIN_RATE_LIMIT_BACKEND: Literal['memory', 'sqlite'] | None = None
+    LOGIN_RATE_LIMIT_STORE: str = 'ratelimit.sqlite3'
+    LOGIN_RATE_LIMIT_PRUNE_INTERVAL_SECONDS: int = 10 * 60
+    LOGIN_CLIENT_BURST: int = 20
+    LOGIN_CLIENT_PER_MINUTE: float = 20
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_EMAIL_PER_MINUTE: float = 5
+    BATCH_MAX_OPERATIONS: int = 100
+    COALESCE_WAIT_SECONDS: float = 5.0
+    IDEMPOTENCY_BACKEND: Literal['memory', 'database'] = 'memory'
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_LEASE_SECONDS: int = 60
+    IDEMPOTENCY_MAX_ENTRIES: int = 10_000
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 60 * 60
+    METRICS_TOKEN: str | None = None
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str | None = None
+    PROFILING_OUTPUT_DIR: str = 'profiles'
+    PROFILING_INTERVAL_MS: float = 1.0
+    STATEMENT_TIMEOUT_MS: int = 10_000
+    STATEMENT_TIMEOUTS: dict[str, int] = {
+        'GET /book/': 2_000,
+        'GET /novelist/': 2_000,
+    }
+    STATEMENT_TIMEOUT_RETRY_AFTER: int = 1
+    AUTOCOMPLETE_MAX_ENTRIES: int = 100_000
+    AUTOCOMPLETE_MAX_RESULTS: int = 20
+    AUTOCOMPLETE_REFRESH_SECONDS: float = 2.0
+    AUDIT_QUEUE_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.1
     model_config = SettingsConfigDict(
         env_file='.env', env_file_encoding='utf-8'
     )
@@ -0,0 +1,74 @@
+"""
+SQLite deployment profile.
+
+Every SQLite connection is tuned when it is opened: a busy timeout so a
+locked database is waited on instead of failing at once, ``synchronous
+= NORMAL``, a memory-mapped I/O window and a larger page cache. File
+databases also switch to write-ahead logging, so readers keep working
+from the last committed snapshot while a write is under way.
+
+WAL still allows a single writer at a time. Instead of letting pooled
+connections race for the write lock, ``database`` opens a second engine
+holding one writer connection, and ``RoutingSession`` sends a session's
+statements there from its first write until the end of its transaction.
+Concurrent writers then queue on the pool, in order, rather than retry
+on ``database is locked``. A writer still waiting when the pool timeout
+runs out is answered with 503 and Retry-After, like a locked database.
+"""
+
+from sqlalchemy import event, make_url
+from sqlalchemy.engine import Engine
+
+from madrproject.config.settings import settings
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def is_sqlite_file(url: str) -> bool:
+    """
+    Tells whether the URL points at an SQLite database on disk, the only
+    kind that supports WAL and a separate writer connection.
+    """
+    return is_sqlite(url) and make_url(url).database not in {
+        None,
+        '',
+        ':memory:',
+    }
+
+
+def pragmas(wal: bool) -> list[str]:
+    statements = [
+        f'PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}',
+        'PRAGMA synchronous = NORMAL',
+        f'PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}',
+        # A negative cache size is a number of KiB rather than of pages.
+        f'PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KIB}',
+    ]
+    if wal:
+        statements.insert(0, 'PRAGMA journal_mode = WAL')
+    return statements
+
+
+def install_sqlite_profile(engine: Engine) -> None:
+    """
+    Applies the SQLite pragmas to every connection the engine opens.
+
+    Args:
+        engine (Engine): Engine of an SQLite database; other engines are
+            left untouched.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    statements = pragmas(wal=is_sqlite_file(str(engine.url)))
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
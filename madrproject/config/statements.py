@@ -0,0 +1,38 @@
+"""
+Prebuilt statements for the hot lookups.
+
+Building a ``select()`` on every request costs Python time twice: once to
+construct the statement and once to compute the cache key SQLAlchemy
+uses to find its compiled form. These statements are built once at
+import time with bound parameters, so every execution reuses the same
+object, its memoized cache key and the same entry of the engine's
+compiled cache. Pass the parameter values at execution time::
+
+    session.scalar(BOOK_BY_ID, {'book_id': book_id})
+"""
+
+from sqlalchemy import bindparam, select
+
+from madrproject.accounts.models import Account
+from madrproject.books.models import Books
+from madrproject.novelists.models import Novelist
+
+ACCOUNT_BY_EMAIL = select(Account).where(Account.email == bindparam('email'))
+
+BOOK_BY_ID = select(Books).where(Books.id == bindparam('book_id'))
+
+BOOK_BY_TITLE = select(Books).where(Books.title == bindparam('title')).limit(1)
+
+NOVELIST_BY_ID = select(Novelist).where(
+    Novelist.id == bindparam('novelist_id')
+)
+
+NOVELIST_BY_NAME = select(Novelist).where(Novelist.name == bindparam('name'))
+
+HOT_STATEMENTS = {
+    'account_by_email': (ACCOUNT_BY_EMAIL, {'email': ''}),
+    'book_by_id': (BOOK_BY_ID, {'book_id': 0}),
+    'book_by_title': (BOOK_BY_TITLE, {'title': ''}),
+    'novelist_by_id': (NOVELIST_BY_ID, {'novelist_id': 0}),
+    'novelist_by_name': (NOVELIST_BY_NAME, {'name': ''}),
+}
@@ -0,0 +1,196 @@
+"""
+Per-route statement timeouts.
+
+``get_session`` tags each request's session with the timeout configured
+for its route: ``STATEMENT_TIMEOUTS`` maps ``'<METHOD> <path>'`` to a
+number of milliseconds, and other routes use ``STATEMENT_TIMEOUT_MS``.
+When the session begins a transaction, the timeout is applied to its
+connection: PostgreSQL gets ``SET LOCAL statement_timeout``, and SQLite
+gets a progress handler that interrupts any statement running past its
+deadline. A cancelled statement is answered with 503 and Retry-After,
+and counted per route in ``statement_timeouts_total``. A lost
+connection or a locked SQLite database is just as transient, so it is
+logged, counted in ``database_errors_total`` and answered with 503 as
+well, and so is a request that gave up waiting for a pooled connection
+(``pool_timeouts_total``). Every other ``OperationalError`` (on SQLite,
+a missing table or a syntax error) is a bug that retrying will not fix,
+and stays a 500.
+"""
+
+import logging
+import math
+import sqlite3
+import time
+from http import HTTPStatus
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from madrproject.config.metrics import metrics
+from madrproject.config.settings import settings
+
+logger = logging.getLogger('madrproject.database')
+
+TIMEOUT_KEY = 'statement_timeout_ms'
+DEADLINE_KEY = 'statement_deadline'
+# SQLite virtual machine instructions between two deadline checks.
+PROGRESS_INTERVAL = 1_000
+POSTGRES_QUERY_CANCELED = '57014'
+SQLITE_LOCKED_MESSAGES = {'database is locked', 'database table is locked'}
+
+
+def route_label(request: Request) -> str:
+    route = request.scope.get('route')
+    path = route.path if route is not None else request.url.path
+    return f'{request.method} {path}'
+
+
+def statement_timeout_for(request: Request) -> int:
+    """
+    Returns the statement timeout configured for the request's route.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        int: Timeout in milliseconds; 0 disables it.
+    """
+    return settings.STATEMENT_TIMEOUTS.get(
+        route_label(request), settings.STATEMENT_TIMEOUT_MS
+    )
+
+
+def set_statement_timeout(session: Session, timeout_ms: int) -> None:
+    """
+    Applies a timeout to every statement of the session's transactions.
+
+    Args:
+        session (Session): Session to limit.
+        timeout_ms (int): Timeout in milliseconds; 0 disables it.
+    """
+    if timeout_ms > 0:
+        session.info[TIMEOUT_KEY] = timeout_ms
+    else:
+        session.info.pop(TIMEOUT_KEY, None)
+
+
+@event.listens_for(Session, 'after_begin')
+def _apply_timeout(session, transaction, connection):
+    timeout_ms = session.info.get(TIMEOUT_KEY)
+    if timeout_ms is None:
+        return
+
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        connection.exec_driver_sql(
+            f'SET LOCAL statement_timeout = {int(timeout_ms)}'
+        )
+    elif dialect == 'sqlite':
+        info = connection.info
+        info[TIMEOUT_KEY] = timeout_ms
+        info[DEADLINE_KEY] = math.inf
+
+        def past_deadline():
+            return time.monotonic() > info.get(DEADLINE_KEY, math.inf)
+
+        connection.connection.dbapi_connection.set_progress_handler(
+            past_deadline, PROGRESS_INTERVAL
+        )
+
+
+def install_statement_timeouts(engine: Engine) -> None:
+    """
+    Starts the SQLite deadline of each statement and clears the timeout
+    when the connection goes back to the pool.
+
+    Args:
+        engine (Engine): Engine whose connections are limited.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_deadline(conn, cursor, statement, *args):
+        timeout_ms = conn.info.get(TIMEOUT_KEY)
+        if timeout_ms is not None:
+            conn.info[DEADLINE_KEY] = time.monotonic() + timeout_ms / 1000
+
+    @event.listens_for(engine, 'checkin')
+    def clear_timeout(dbapi_connection, connection_record):
+        if connection_record.info.pop(TIMEOUT_KEY, None) is None:
+            return
+
+        connection_record.info.pop(DEADLINE_KEY, None)
+        if dbapi_connection is not None:
+            dbapi_connection.set_progress_handler(None, 0)
+
+
+def is_statement_timeout(error: OperationalError) -> bool:
+    original = error.orig
+    if isinstance(original, sqlite3.OperationalError):
+        return str(original) == 'interrupted'
+
+    sqlstate = getattr(original, 'sqlstate', None) or getattr(
+        original, 'pgcode', None
+    )
+    return sqlstate == POSTGRES_QUERY_CANCELED
+
+
+def is_unavailable(error: OperationalError) -> bool:
+    if error.connection_invalidated:
+        return True
+
+    original = error.orig
+    return (
+        isinstance(original, sqlite3.OperationalError)
+        and str(original) in SQLITE_LOCKED_MESSAGES
+    )
+
+
+async def operational_error_handler(request: Request, error: OperationalError):
+    """
+    Turns a cancelled statement, or a database that cannot answer, into
+    503 Service Unavailable.
+
+    By the time this runs, the request's session has been closed and its
+    connection returned to the pool.
+
+    Raises:
+        OperationalError: If the error is not transient, so it is
+            answered with 500.
+    """
+    route = route_label(request)
+    if is_statement_timeout(error):
+        metrics.increment('statement_timeouts_total', route=route)
+        detail = 'The query took too long, try again later.'
+    elif is_unavailable(error):
+        logger.error('Database error on %s: %s', route, error.orig)
+        metrics.increment('database_errors_total', route=route)
+        detail = 'The database is unavailable, try again later.'
+    else:
+        raise error
+
+    return _unavailable(detail)
+
+
+async def pool_timeout_handler(request: Request, error: PoolTimeoutError):
+    """
+    Turns a request that waited too long for a connection, such as a
+    writer queued behind the single SQLite writer connection, into 503
+    Service Unavailable.
+    """
+    metrics.increment('pool_timeouts_total', route=route_label(request))
+    return _unavailable('The database is busy, try again later.')
+
+
+def _unavailable(detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        content={'detail': detail},
+        headers={'Retry-After': str(settings.STATEMENT_TIMEOUT_RETRY_AFTER)},
+    )
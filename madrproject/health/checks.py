@@ -0,0 +1,128 @@
+"""
+Startup warm-up and the readiness check.
+
+At startup each worker opens ``WARM_UP_CONNECTIONS`` pooled connections
+and runs every hot statement once, so the first real requests neither
+connect to the database nor compile SQL. The worker only reports ready
+once that is done.
+
+The readiness check pings the database at most once per
+``READINESS_CACHE_SECONDS``; probes arriving in between, or while a ping
+is running, get the last result. Probes therefore cost nothing to the
+database however often they come.
+"""
+
+import threading
+import time
+from contextlib import ExitStack
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from madrproject.config.statements import HOT_STATEMENTS
+
+
+def warm_pool(engine: Engine, connections: int) -> int:
+    """
+    Opens connections up front so they wait in the pool.
+
+    Args:
+        engine (Engine): Engine whose pool is filled.
+        connections (int): Number of connections to open; capped at the
+            pool size.
+
+    Returns:
+        int: Number of connections opened.
+    """
+    pool_size = getattr(engine.pool, 'size', None)
+    if callable(pool_size):
+        connections = min(connections, pool_size())
+
+    with ExitStack() as stack:
+        for _ in range(connections):
+            connection = stack.enter_context(engine.connect())
+            connection.execute(text('SELECT 1'))
+    return connections
+
+
+def precompile_statements(engine: Engine) -> None:
+    """
+    Runs every hot statement once to fill the compiled statement cache.
+    """
+    with Session(engine) as session:
+        for statement, params in HOT_STATEMENTS.values():
+            session.execute(statement, params).all()
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    stats = {'class': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        value = getattr(pool, name, None)
+        if callable(value):
+            stats[name] = value()
+    return stats
+
+
+class ReadinessCheck:
+    """
+    Cached, rate-limited database reachability check.
+    """
+
+    def __init__(self, engine: Engine, cache_seconds: float):
+        self.engine = engine
+        self.cache_seconds = cache_seconds
+        self.started = False
+        self._lock = threading.Lock()
+        self._result: dict | None = None
+        self._checked_at = 0.0
+
+    def mark_started(self) -> None:
+        self.started = True
+
+    def _ping(self) -> dict:
+        started = time.monotonic()
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except SQLAlchemyError as error:
+            return {'reachable': False, 'error': type(error).__name__}
+
+        return {
+            'reachable': True,
+            'latency_ms': round((time.monotonic() - started) * 1000, 2),
+        }
+
+    def _is_stale(self) -> bool:
+        return (
+            self._result is None
+            or time.monotonic() - self._checked_at >= self.cache_seconds
+        )
+
+    def check(self) -> dict:
+        """
+        Returns the readiness of the worker, pinging the database if the
+        cached result is stale and no other ping is running.
+
+        Returns:
+            dict: ``ready`` plus the database and pool details.
+        """
+        if self._is_stale() and self._lock.acquire(
+            blocking=self._result is None
+        ):
+            try:
+                if self._is_stale():
+                    self._result = self._ping()
+                    self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+
+        database = self._result
+        return {
+            'ready': self.started and database['reachable'],
+            'started': self.started,
+            'database': database,
+            'pool': pool_stats(self.engine),
+        }
@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import anyio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from madrproject.config.database import engine
+from madrproject.config.settings import settings
+from madrproject.health.checks import ReadinessCheck
+
+router = APIRouter(prefix='/health', tags=['health'])
+readiness = ReadinessCheck(
+    engine, cache_seconds=settings.READINESS_CACHE_SECONDS
+)
+# Probes get their own token so a saturated threadpool cannot hold them.
+probe_limiter = anyio.CapacityLimiter(1)
+
+
+@router.get('/live', status_code=HTTPStatus.OK)
+async def liveness():
+    """
+    Route telling whether the worker's event loop is responsive.
+
+    It does not touch the database, so a database outage does not get
+    the worker restarted.
+    """
+    return {'status': 'ok'}
+
+
+@router.get('/ready', status_code=HTTPStatus.OK)
+async def readiness_probe():
+    """
+    Route telling whether the worker can serve traffic.
+
+    Answers 503 until the startup warm-up is done, and whenever the last
+    database check failed.
+    """
+    result = await anyio.to_thread.run_sync(
+        readiness.check, limiter=probe_limiter
+    )
+    status = (
+        HTTPStatus.OK if result['ready'] else HTTPStatus.SERVICE_UNAVAILABLE
+    )
+    return JSONResponse(status_code=status, content=result)
@@ -0,0 +1,157 @@
+"""
+Replay of POST responses for requests carrying an ``Idempotency-Key``.
+
+The middleware sits in front of routing, so a replay returns the stored
+response without validating the body, hashing passwords or touching the
+catalog tables again. Keys are scoped by path and by the Authorization
+header, or by the client address for anonymous requests such as signing
+up, and reusing a key with a different body is rejected. Anonymous
+requests whose client address is unknown are processed without replay.
+"""
+
+import hashlib
+import json
+from http import HTTPStatus
+
+import anyio
+
+from madrproject.idempotency.store import IdempotencyStore, StoredResponse
+
+KEY_HEADER = b'idempotency-key'
+AUTHORIZATION_HEADER = b'authorization'
+REPLAYED_HEADER = b'idempotent-replayed'
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware storing and replaying responses of idempotent POSTs.
+    """
+
+    def __init__(self, app, store: IdempotencyStore, paths: set[str]):
+        self.app = app
+        self.store = store
+        self.paths = paths
+
+    async def _call_store(self, method, *args):
+        if self.store.blocking:
+            return await anyio.to_thread.run_sync(method, *args)
+        return method(*args)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope['type'] != 'http'
+            or scope['method'] != 'POST'
+            or scope['path'] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope['headers'])
+        idempotency_key = headers.get(KEY_HEADER)
+        owner = _owner(scope, headers)
+        if not idempotency_key or owner is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        key = hashlib.sha256(
+            b'\0'.join((scope['path'].encode(), owner, idempotency_key))
+        ).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        if not await self._call_store(self.store.reserve, key, fingerprint):
+            stored = await self._call_store(self.store.get, key)
+            await self._replay(stored, fingerprint, send)
+            return
+
+        body_replayed = False
+
+        async def replay_receive():
+            nonlocal body_replayed
+            if body_replayed:
+                return await receive()
+
+            body_replayed = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        response = StoredResponse(fingerprint=fingerprint)
+
+        async def capture_send(message):
+            if message['type'] == 'http.response.start':
+                response.status = message['status']
+                response.headers = [
+                    [name.decode('latin-1'), value.decode('latin-1')]
+                    for name, value in message.get('headers', [])
+                ]
+            elif message['type'] == 'http.response.body':
+                response.body += message.get('body', b'')
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await self._call_store(self.store.release, key)
+            raise
+
+        if (
+            response.status is None
+            or response.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+        ):
+            await self._call_store(self.store.release, key)
+        else:
+            await self._call_store(self.store.complete, key, response)
+
+    @staticmethod
+    async def _replay(stored: StoredResponse | None, fingerprint: str, send):
+        if stored is None or stored.in_progress:
+            status = HTTPStatus.CONFLICT
+            detail = 'A request with this Idempotency-Key is in progress.'
+        elif stored.fingerprint != fingerprint:
+            status = HTTPStatus.UNPROCESSABLE_ENTITY
+            detail = 'This Idempotency-Key was used with a different body.'
+        else:
+            await send({
+                'type': 'http.response.start',
+                'status': stored.status,
+                'headers': [
+                    *(
+                        (name.encode('latin-1'), value.encode('latin-1'))
+                        for name, value in stored.headers
+                    ),
+                    (REPLAYED_HEADER, b'true'),
+                ],
+            })
+            await send({'type': 'http.response.body', 'body': stored.body})
+            return
+
+        content = json.dumps({'detail': detail}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(content)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+
+def _owner(scope, headers: dict[bytes, bytes]) -> bytes | None:
+    """
+    Identifies who a key belongs to: the credentials sent, or the client
+    address of anonymous requests.
+    """
+    authorization = headers.get(AUTHORIZATION_HEADER)
+    if authorization:
+        return b'authorization:' + authorization
+
+    client = scope.get('client')
+    if not client:
+        return None
+    return b'client:' + client[0].encode()
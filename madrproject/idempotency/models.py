@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from madrproject.config.database import mapper_registry
+
+
+@mapper_registry.mapped_as_dataclass
+class IdempotencyRecord:
+    __tablename__ = 'idempotency_keys'
+    key: Mapped[str] = mapped_column(primary_key=True)
+    fingerprint: Mapped[str]
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+    status: Mapped[int | None] = mapped_column(default=None)
+    headers: Mapped[list | None] = mapped_column(JSON, default=None)
+    body: Mapped[bytes | None] = mapped_column(LargeBinary, default=None)
@@ -0,0 +1,197 @@
+"""
+Stores for the responses of requests sent with an ``Idempotency-Key``.
+
+A key is first reserved with the fingerprint of the request body, while
+the request runs, and then completed with the response. ``MemoryStore``
+keeps the entries in a per-process LRU; ``DatabaseStore`` keeps them in
+the ``idempotency_keys`` table so every worker sees them. A database
+reservation only lasts a short lease, extended to the full TTL once the
+response is stored: a worker that dies mid-request leaves a row behind,
+and retries must not be turned away as "in progress" for the whole TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Protocol
+
+from sqlalchemy import delete, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from madrproject.config.database import utcnow
+from madrproject.idempotency.models import IdempotencyRecord
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status: int | None = None
+    headers: list[list[str]] = field(default_factory=list)
+    body: bytes = b''
+
+    @property
+    def in_progress(self) -> bool:
+        return self.status is None
+
+
+class IdempotencyStore(Protocol):
+    blocking: bool
+
+    def get(self, key: str) -> StoredResponse | None: ...
+
+    def reserve(self, key: str, fingerprint: str) -> bool: ...
+
+    def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    def release(self, key: str) -> None: ...
+
+
+class MemoryStore:
+    """
+    Per-process LRU of stored responses with TTL expiry.
+    """
+
+    blocking = False
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[StoredResponse, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> StoredResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            response, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return response
+
+    def reserve(self, key: str, fingerprint: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return False
+
+            self._entries[key] = (
+                StoredResponse(fingerprint=fingerprint),
+                time.monotonic() + self.ttl,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (response, self._entries[key][1])
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DatabaseStore:
+    """
+    Stored responses shared by all workers through a database table.
+    """
+
+    blocking = True
+
+    def __init__(self, engine: Engine, ttl: float, lease: float):
+        """
+        Args:
+            engine (Engine): Engine of the database holding the table.
+            ttl (float): Seconds a completed response is kept.
+            lease (float): Seconds a reservation is kept before the
+                response is stored.
+        """
+        self.engine = engine
+        self.ttl = ttl
+        self.lease = lease
+
+    def get(self, key: str) -> StoredResponse | None:
+        with Session(self.engine) as session:
+            record = session.get(IdempotencyRecord, key)
+            if record is None or record.expires_at <= utcnow():
+                return None
+
+            return StoredResponse(
+                fingerprint=record.fingerprint,
+                status=record.status,
+                headers=record.headers or [],
+                body=record.body or b'',
+            )
+
+    def reserve(self, key: str, fingerprint: str) -> bool:
+        now = utcnow()
+
+        with Session(self.engine) as session:
+            session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.expires_at <= now,
+                )
+            )
+            session.add(
+                IdempotencyRecord(
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=self.lease),
+                )
+            )
+            try:
+                session.commit()
+            except IntegrityError:
+                return False
+            return True
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with Session(self.engine) as session:
+            session.execute(
+                update(IdempotencyRecord)
+                .where(IdempotencyRecord.key == key)
+                .values(
+                    status=response.status,
+                    headers=response.headers,
+                    body=response.body,
+                    expires_at=utcnow() + timedelta(seconds=self.ttl),
+                )
+            )
+            session.commit()
+
+    def release(self, key: str) -> None:
+        with Session(self.engine) as session:
+            session.execute(
+                delete(IdempotencyRecord).where(IdempotencyRecord.key == key)
+            )
+            session.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Deletes every expired entry.
+
+        Returns:
+            int: Number of entries deleted.
+        """
+        with Session(self.engine) as session:
+            result = session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.expires_at <= utcnow()
+                )
+            )
+            session.commit()
+            return result.rowcount
@@ -0,0 +1,104 @@
+"""
+Consistency check for the denormalized ``Novelist.book_count`` column.
+
+Usage:
+    python -m madrproject.novelists.consistency [--fix]
+"""
+
+import argparse
+import sys
+from typing import Sequence
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.orm import Session
+
+from madrproject.books.models import Books
+from madrproject.changes.sequence import next_change_seq
+from madrproject.config.database import RoutingSession
+from madrproject.novelists.models import Novelist
+
+
+def find_book_count_drift(session: Session) -> Sequence[Row]:
+    """
+    Compares every stored counter against the real number of books.
+
+    Args:
+        session (Session): SQLAlchemy session for database interaction.
+
+    Returns:
+        list: Rows of (id, name, book_count, actual) for each novelist
+        whose stored counter is out of sync.
+    """
+    actual = (
+        select(func.count(Books.id))
+        .where(Books.novelist_id == Novelist.id)
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            Novelist.id,
+            Novelist.name,
+            Novelist.book_count,
+            actual.label('actual'),
+        )
+        .where(Novelist.book_count != actual)
+        .order_by(Novelist.id)
+    )
+    return session.execute(query).all()
+
+
+def repair_book_counts(session: Session, novelist_ids: list[int]) -> None:
+    """
+    Recomputes the counter of the given novelists from the books table.
+
+    Args:
+        session (Session): SQLAlchemy session for database interaction.
+        novelist_ids (list[int]): IDs of the novelists to repair.
+    """
+    actual = (
+        select(func.count(Books.id))
+        .where(Books.novelist_id == Novelist.id)
+        .scalar_subquery()
+    )
+    session.execute(
+        update(Novelist)
+        .where(Novelist.id.in_(novelist_ids))
+        .values(book_count=actual, change_seq=next_change_seq(session))
+    )
+    session.commit()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Check novelists.book_count against the books table.'
+    )
+    parser.add_argument(
+        '--fix',
+        action='store_true',
+        help='rewrite the counters that are out of sync',
+    )
+    args = parser.parse_args(argv)
+
+    with RoutingSession() as session:
+        drift = find_book_count_drift(session)
+
+        for row in drift:
+            print(
+                f'novelist {row.id} ({row.name}): '
+                f'stored {row.book_count}, actual {row.actual}'
+            )
+
+        if not drift:
+            print('All book counters are consistent.')
+            return 0
+
+        if args.fix:
+            repair_book_counts(session, [row.id for row in drift])
+            print(f'Repaired {len(drift)} novelist(s).')
+            return 0
+
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,10 @@
+from datetime import datetime
 from typing import List
 
+from sqlalchemy import BigInteger, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from madrproject.config.database import mapper_registry
+from madrproject.config.database import mapper_registry, utcnow
 
 
 @mapper_registry.mapped_as_dataclass
@@ -10,6 +12,25 @@ class Novelist:
     __tablename__ = 'novelists'
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     name: Mapped[str] = mapped_column(unique=True)
+    book_count: Mapped[int] = mapped_column(
+        init=False, default=0, server_default=text('0')
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        init=False,
+        insert_default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+    )
+    version_id: Mapped[int] = mapped_column(
+        init=False, server_default=text('1')
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        init=False,
+        default=0,
+        server_default=text('0'),
+        index=True,
+    )
 
     books: Mapped[List['Books']] = relationship(
         'Books',
@@ -17,3 +38,5 @@ class Novelist:
         cascade='all, delete-orphan',
         default_factory=list,
     )
+
+    __mapper_args__ = {'version_id_col': version_id}
@@ -0,0 +1,111 @@
+from sqlalchemy.orm import Session
+
+from madrproject.changes.repository import ChangesRepository
+from madrproject.config.statements import NOVELIST_BY_ID, NOVELIST_BY_NAME
+from madrproject.novelists.models import Novelist
+
+
+class NovelistRepository:
+    """
+    Repository class for managing novelists in the database.
+    """
+
+    def __init__(self, session: Session, autocommit: bool = True):
+        """
+        Initializes the repository with a database session.
+
+        Args:
+            session (Session): SQLAlchemy session for database interaction.
+            autocommit (bool): Commit after each write. When False, writes
+                are only flushed and the caller owns the transaction.
+        """
+        self.session = session
+        self.autocommit = autocommit
+
+    def _save(self, novelist: Novelist | None = None) -> None:
+        if not self.autocommit:
+            self.session.flush()
+            return
+
+        self.session.commit()
+        if novelist is not None:
+            self.session.refresh(novelist)
+
+    def get_novelist_by_id(self, novelist_id: int) -> Novelist | None:
+        """
+        Retrieves a novelist by its ID.
+
+        Args:
+            novelist_id (int): ID of the novelist to retrieve.
+
+        Returns:
+            Novelist: The novelist object, or None if not found.
+        """
+        return self.session.scalar(
+            NOVELIST_BY_ID, {'novelist_id': novelist_id}
+        )
+
+    def get_novelist_by_name(self, name: str) -> Novelist | None:
+        """
+        Retrieves a novelist by its name.
+
+        Args:
+            name (str): Name of the novelist to retrieve.
+
+        Returns:
+            Novelist: The novelist object, or None if not found.
+        """
+        return self.session.scalar(NOVELIST_BY_NAME, {'name': name})
+
+    def create_novelist(self, name: str) -> Novelist:
+        """
+        Inserts a new novelist into the database.
+
+        Args:
+            name (str): Name of the novelist.
+
+        Returns:
+            Novelist: The created novelist object.
+        """
+        new_novelist = Novelist(name=name)
+        self.session.add(new_novelist)
+        self._save(new_novelist)
+        return new_novelist
+
+    def update_novelist(
+        self, novelist_db: Novelist, updated_data: dict
+    ) -> Novelist:
+        """
+        Updates an existing novelist in the database.
+
+        Args:
+            novelist_db (Novelist): The novelist object to update.
+            updated_data (dict): Dictionary with fields to update.
+
+        Returns:
+            Novelist: The updated novelist object.
+        """
+        for key, value in updated_data.items():
+            setattr(novelist_db, key, value)
+
+        self.session.add(novelist_db)
+        self._save(novelist_db)
+        return novelist_db
+
+    def delete_novelist(self, novelist_db: Novelist) -> None:
+        """
+        Deletes a novelist and, by cascade, its books.
+
+        Tombstones are recorded for the novelist and every deleted book.
+
+        Args:
+            novelist_db (Novelist): The novelist object to delete.
+        """
+        changes = ChangesRepository(self.session)
+        changes.record_deletions(
+            'book', [book.id for book in novelist_db.books]
+        )
+        changes.record_deletions('novelist', [novelist_db.id])
+
+        self.session.delete(novelist_db)
+        self._save()
@@ -1,30 +1,60 @@
 from http import HTTPStatus
-
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+)
 from sqlalchemy.future import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.exc import StaleDataError
 
 from madrproject import Novelist
 from madrproject.accounts.models import Account
+from madrproject.changes.repository import ChangesRepository
+from madrproject.changes.schemas import NovelistChangesSchema
+from madrproject.config.autocomplete import PrefixIndex
+from madrproject.config.coalescing import SingleFlight
+from madrproject.config.concurrency import (
+    Precondition,
+    etag,
+    raise_precondition_failed,
+)
 from madrproject.config.database import get_session
 from madrproject.config.security import get_current_account
+from madrproject.config.settings import settings
+from madrproject.novelists.repository import NovelistRepository
 from madrproject.novelists.schemas import (
+    NovelistListQuery,
     NovelistPublicSchema,
     NovelistPublicSchemaList,
     NovelistSchema,
+    NovelistSuggestionListSchema,
     UpdateNovelistSchema,
 )
 
 router = APIRouter(prefix='/novelist', tags=['novelist'])
+novelist_reads = SingleFlight(
+    'novelists', timeout=settings.COALESCE_WAIT_SECONDS
+)
+novelist_names = PrefixIndex(
+    'novelist_names',
+    Novelist,
+    'name',
+    'novelist',
+    max_entries=settings.AUTOCOMPLETE_MAX_ENTRIES,
+)
 
 
 @router.post('/', response_model=NovelistPublicSchema, status_code=201)
 def create_new_novelist(
     novelist: NovelistSchema, session: Session = Depends(get_session)
 ):
-    existing_novelist = (
-        session.query(Novelist).filter(Novelist.name == novelist.name).first()
-    )
+    repository = NovelistRepository(session)
+    existing_novelist = repository.get_novelist_by_name(novelist.name)
 
     if existing_novelist:
         raise HTTPException(
@@ -32,43 +62,81 @@ def create_new_novelist(
             detail=f'The novelist with name {novelist.name} already exists.',
         )
 
-    new_novelist = Novelist(name=novelist.name)
-    session.add(new_novelist)
-    session.commit()
-    session.refresh(new_novelist)
-
-    return new_novelist
+    return repository.create_novelist(novelist.name)
 
 
 @router.get(
     '/', response_model=NovelistPublicSchemaList, status_code=HTTPStatus.OK
 )
 def list_novelists(
-    name: str | None = None,
+    filters: NovelistListQuery = Depends(),
     session: Session = Depends(get_session),
     account: Account = Depends(get_current_account),
-    limit: int = 3,
-    offset: int = 0,
 ):
-    query = select(Novelist)
+    def read_novelists() -> str:
+        query = select(Novelist).options(selectinload(Novelist.books))
+
+        if filters.name:
+            query = query.filter(Novelist.name.contains(filters.name))
+
+        if filters.sort == 'book_count':
+            query = query.order_by(Novelist.book_count, Novelist.id)
+        elif filters.sort == '-book_count':
+            query = query.order_by(Novelist.book_count.desc(), Novelist.id)
 
-    if name:
-        query = query.filter(Novelist.name.contains(name))
+        novelists = session.scalars(
+            query.offset(filters.offset).limit(filters.limit)
+        ).all()
 
-    novelists = session.scalars(query.offset(offset).limit(limit)).all()
+        return NovelistPublicSchemaList.model_validate(
+            {'novelists': novelists}, from_attributes=True
+        ).model_dump_json()
 
-    response_data = []
-    for novelist in novelists:
-        response_data.append({
-            'id': novelist.id,
-            'name': novelist.name,
-            'books': [
-                {'id': book.id, 'title': book.title, 'year': book.year}
-                for book in novelist.books
-            ],
-        })
+    payload = novelist_reads.do(('list', filters), read_novelists)
+    return Response(content=payload, media_type='application/json')
 
-    return {'novelists': response_data}
+
+@router.get(
+    '/autocomplete',
+    response_model=NovelistSuggestionListSchema,
+    status_code=HTTPStatus.OK,
+)
+def autocomplete_novelists(
+    q: Annotated[str, Query(min_length=1)],
+    limit: Annotated[
+        int, Query(ge=1, le=settings.AUTOCOMPLETE_MAX_RESULTS)
+    ] = 10,
+    session: Session = Depends(get_session),
+    account: Account = Depends(get_current_account),
+):
+    matches = novelist_names.search(session, q, limit)
+    return {
+        'suggestions': [
+            {'id': novelist_id, 'name': name} for novelist_id, name in matches
+        ]
+    }
+
+
+@router.get(
+    '/changes',
+    response_model=NovelistChangesSchema,
+    status_code=HTTPStatus.OK,
+)
+def list_novelist_changes(
+    since: str | None = None,
+    limit: int = 100,
+    session: Session = Depends(get_session),
+    account: Account = Depends(get_current_account),
+):
+    try:
+        return ChangesRepository(session).list_changes(
+            Novelist, 'novelist', since, limit
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid change cursor.',
+        )
 
 
 @router.get(
@@ -81,17 +149,29 @@ def get_novelist_by_id(
     session: Session = Depends(get_session),
     account: Account = Depends(get_current_account),
 ):
-    novelist_db = session.scalar(
-        select(Novelist).where(Novelist.id == novelist_id)
-    )
-
-    if not novelist_db:
-        raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail=f'The novelist with ID {novelist_id} was not found.',
+    def read_novelist() -> tuple[int, str]:
+        novelist_db = NovelistRepository(session).get_novelist_by_id(
+            novelist_id
         )
 
-    return novelist_db
+        if not novelist_db:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=f'The novelist with ID {novelist_id} was not found.',
+            )
+
+        return novelist_db.version_id, NovelistPublicSchema.model_validate(
+            novelist_db, from_attributes=True
+        ).model_dump_json()
+
+    version_id, payload = novelist_reads.do(
+        ('detail', novelist_id), read_novelist
+    )
+    return Response(
+        content=payload,
+        media_type='application/json',
+        headers={'ETag': etag(version_id)},
+    )
 
 
 @router.patch(
@@ -102,12 +182,12 @@ def get_novelist_by_id(
 def update_novelist(
     novelist: UpdateNovelistSchema,
     novelist_id: int,
+    precondition: Precondition = Depends(),
     session: Session = Depends(get_session),
     account: Account = Depends(get_current_account),
 ):
-    novelist_db = session.scalar(
-        select(Novelist).where(Novelist.id == novelist_id)
-    )
+    repository = NovelistRepository(session)
+    novelist_db = repository.get_novelist_by_id(novelist_id)
 
     if not novelist_db:
         raise HTTPException(
@@ -115,13 +195,17 @@ def update_novelist(
             detail=f'Novelist with ID {novelist_id} was not found',
         )
 
-    for key, value in novelist.model_dump(exclude_unset=True).items():
-        setattr(novelist_db, key, value)
+    precondition.check(novelist_db.version_id)
 
-    session.add(novelist_db)
-    session.commit()
-    session.refresh(novelist_db)
+    try:
+        novelist_db = repository.update_novelist(
+            novelist_db, novelist.model_dump(exclude_unset=True)
+        )
+    except StaleDataError:
+        session.rollback()
+        raise_precondition_failed()
 
+    precondition.set_etag(novelist_db.version_id)
     return novelist_db
 
 
@@ -134,9 +218,8 @@ def delete_novelist(
     session: Session = Depends(get_session),
     account: Account = Depends(get_current_account),
 ):
-    novelist_db = session.scalar(
-        select(Novelist).where(Novelist.id == novelist_id)
-    )
+    repository = NovelistRepository(session)
+    novelist_db = repository.get_novelist_by_id(novelist_id)
 
     if not novelist_db:
         raise HTTPException(
@@ -144,8 +227,11 @@ def delete_novelist(
             detail=f'The Novelist with ID {novelist_id} was not found.',
         )
 
-    session.delete(novelist_db)
-    session.commit()
+    try:
+        repository.delete_novelist(novelist_db)
+    except StaleDataError:
+        session.rollback()
+        raise_precondition_failed()
 
     return {
         'message': 'The novelist was successfully deleted.',
@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 class NovelistSchema(BaseModel):
@@ -13,13 +13,46 @@ class NovelistSchema(BaseModel):
     books: Optional[List] = List
 
 
+class NovelistBookSchema(BaseModel):
+    id: int
+    title: str
+    year: int
+
+
 class NovelistPublicSchema(NovelistSchema):
     id: int
+    book_count: int
+    version_id: int
+    books: List[NovelistBookSchema] = []
 
 
 class NovelistPublicSchemaList(BaseModel):
     novelists: List[NovelistPublicSchema]
 
 
+class NovelistListQuery(BaseModel):
+    """
+    Paging, name filter and order of ``GET /novelist/``.
+
+    Frozen, so a query can key the coalescing of identical reads.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str | None = None
+    limit: int = 3
+    offset: int = 0
+    sort: Literal['book_count', '-book_count'] | None = None
+
+
+class NovelistSuggestionSchema(BaseModel):
+    id: int
+    name: str
+
+
+class NovelistSuggestionListSchema(BaseModel):
+    suggestions: List[NovelistSuggestionSchema]
+
+
 class UpdateNovelistSchema(BaseModel):
     name: str | None = None
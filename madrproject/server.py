@@ -0,0 +1,242 @@
+"""
+Production server: a pre-forking master running uvicorn workers.
+
+The master imports the application once, binds the listening socket and
+forks ``WEB_WORKERS`` workers (one per available core by default). The
+workers share the preloaded modules and settings copy-on-write, and each
+one discards the database connections inherited from the master before
+serving, so no connection is ever shared between processes.
+
+Signals sent to the master:
+
+* ``SIGTERM`` / ``SIGINT``: graceful drain. Workers stop accepting
+  connections, finish the requests in flight (for at most
+  ``WEB_GRACEFUL_TIMEOUT`` seconds) and exit, then the master exits.
+* ``SIGHUP``: graceful rolling restart. Workers are replaced one at a
+  time, each new worker being started before the old one is drained, so
+  the socket never stops accepting connections. Code changes need a new
+  master, since workers are forked from the already loaded application.
+
+Workers that die unexpectedly are replaced. Run with::
+
+    python -m madrproject.server
+"""
+
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from madrproject.app import app
+from madrproject.config.database import engine, writer_engine
+from madrproject.config.settings import settings
+
+logger = logging.getLogger('madrproject.server')
+
+# Seconds between two checks of the workers by the master.
+MONITOR_INTERVAL = 0.2
+# Exit status of a worker that crashed after it started serving.
+WORKER_FAILURE = 1
+# Exit status of a worker whose application failed to start.
+STARTUP_FAILURE = 3
+
+
+def default_worker_count() -> int:
+    """
+    Returns the number of cores this process may run on.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    # An explicit IPPROTO_TCP lets asyncio set TCP_NODELAY on accepted
+    # connections; without it keep-alive responses stall on Nagle.
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(settings.WEB_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket) -> int:
+    """
+    Serves the preloaded application on the shared socket until told to
+    stop. Runs in a freshly forked child.
+
+    Returns:
+        int: Exit status of the worker.
+    """
+    # uvicorn installs its own SIGTERM/SIGINT handlers; SIGHUP is meant
+    # for the master even when it is delivered to the whole group.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    # The pooled connections were opened by the master; forget them
+    # without closing them, since the master still owns the sockets.
+    engine.dispose(close=False)
+    writer_engine.dispose(close=False)
+
+    config = uvicorn.Config(
+        app,
+        lifespan='on',
+        backlog=settings.WEB_BACKLOG,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        server_header=False,
+    )
+    server = uvicorn.Server(config)
+    try:
+        server.run(sockets=[sock])
+    except Exception:
+        logger.exception('Worker %s crashed', os.getpid())
+        return WORKER_FAILURE if server.started else STARTUP_FAILURE
+    return 0 if server.started else STARTUP_FAILURE
+
+
+class Master:
+    """
+    Forks the workers and keeps their number constant.
+    """
+
+    def __init__(self, sock: socket.socket, workers: int):
+        self.sock = sock
+        self.workers = workers
+        self.pids: set[int] = set()
+        self.stopping = False
+        self.failed = False
+        self.restart_requested = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # Only run_worker knows whether the application started; any
+            # other failure is treated as a crash and the worker replaced.
+            status = WORKER_FAILURE
+            try:
+                status = run_worker(self.sock)
+            finally:
+                os._exit(status)
+
+        self.pids.add(pid)
+        logger.info('Started worker %s', pid)
+        return pid
+
+    def stop_worker(self, pid: int) -> None:
+        """
+        Drains one worker and waits until it has exited.
+        """
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+        deadline = time.monotonic() + settings.WEB_GRACEFUL_TIMEOUT + 5
+        while time.monotonic() < deadline:
+            finished, _ = os.waitpid(pid, os.WNOHANG)
+            if finished:
+                break
+            time.sleep(MONITOR_INTERVAL)
+        else:
+            logger.warning('Worker %s did not drain in time', pid)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+        self.pids.discard(pid)
+        logger.info('Stopped worker %s', pid)
+
+    def reap(self) -> None:
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.pids.clear()
+                return
+
+            if not pid:
+                return
+            if pid in self.pids:
+                self.pids.discard(pid)
+                code = os.waitstatus_to_exitcode(status)
+                logger.warning('Worker %s exited with status %s', pid, code)
+
+                if code == STARTUP_FAILURE:
+                    logger.error('Worker failed to start, shutting down')
+                    self.stopping = True
+                    self.failed = True
+
+    def rolling_restart(self) -> None:
+        for pid in list(self.pids):
+            self.spawn()
+            self.stop_worker(pid)
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def handle_restart(self, signum, frame):
+        self.restart_requested = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_restart)
+
+        for _ in range(self.workers):
+            self.spawn()
+
+        while not self.stopping:
+            time.sleep(MONITOR_INTERVAL)
+            self.reap()
+
+            if self.restart_requested:
+                self.restart_requested = False
+                logger.info('Restarting workers')
+                self.rolling_restart()
+
+            while not self.stopping and len(self.pids) < self.workers:
+                self.spawn()
+
+        logger.info('Draining %s workers', len(self.pids))
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.pids):
+            self.stop_worker(pid)
+
+        return STARTUP_FAILURE if self.failed else 0
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO, format='%(asctime)s %(name)s %(message)s'
+    )
+
+    workers = settings.WEB_WORKERS or default_worker_count()
+    # Shared state such as the login rate limiter is chosen, in each
+    # worker, from the actual number of workers.
+    settings.WEB_WORKERS = workers
+    sock = bind_socket(settings.WEB_HOST, settings.WEB_PORT)
+    logger.info(
+        'Listening on %s:%s with %s workers',
+        settings.WEB_HOST,
+        settings.WEB_PORT,
+        workers,
+    )
+
+    status = Master(sock, workers).run()
+    sock.close()
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
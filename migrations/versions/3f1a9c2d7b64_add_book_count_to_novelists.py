@@ -0,0 +1,40 @@
+"""add book_count to novelists
+
+Revision ID: 3f1a9c2d7b64
+Revises: c82465b1458f
+Create Date: 2026-10-19 09:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2d7b64'
+down_revision: Union[str, None] = 'c82465b1458f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'novelists',
+        sa.Column(
+            'book_count',
+            sa.Integer(),
+            server_default=sa.text('0'),
+            nullable=False,
+        ),
+    )
+    # Backfill the counter from the existing books.
+    op.execute(
+        'UPDATE novelists SET book_count = ('
+        'SELECT count(books.id) FROM books '
+        'WHERE books.novelist_id = novelists.id)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('novelists', 'book_count')
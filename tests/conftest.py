@@ -0,0 +1,170 @@
+import os
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ.setdefault('ALGORITHM', 'HS256')
+os.environ.setdefault('ACCESS_TOKEN_EXPIRES_MINUTES', '30')
+os.environ.setdefault('WARM_UP_ON_STARTUP', 'false')
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from madrproject import Account, Books, Novelist  # noqa: E402
+from madrproject.app import app  # noqa: E402
+from madrproject.audit.log import audit_log  # noqa: E402
+from madrproject.config.database import (  # noqa: E402
+    RoutingSession,
+    get_session,
+    metadata,
+)
+from madrproject.config.security import create_access_token  # noqa: E402
+
+QUERY_REPORT: dict[str, dict] = {}
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements sent to the database while active.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements: list[str] = []
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.count = 0
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--query-report',
+        default=None,
+        help='write the per-route SQL statement counts to this file',
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not QUERY_REPORT:
+        return
+
+    sizes = sorted({
+        size for row in QUERY_REPORT.values() for size in row['counts']
+    })
+    lines = [
+        '| route | budget | ' + ' | '.join(f'n={n}' for n in sizes) + ' |',
+        '|---|---|' + '---|' * len(sizes),
+    ]
+    for route, row in sorted(QUERY_REPORT.items()):
+        counts = ' | '.join(str(row['counts'].get(n, '')) for n in sizes)
+        lines.append(f'| {route} | {row["budget"]} | {counts} |')
+
+    terminalreporter.write_sep('-', 'SQL statements per request')
+    for line in lines:
+        terminalreporter.write_line(line)
+
+    path = config.getoption('--query-report')
+    if path:
+        with open(path, 'w', encoding='utf-8') as report:
+            report.write('\n'.join(lines) + '\n')
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool,
+    )
+    metadata.create_all(engine)
+    yield engine
+    metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(engine):
+    def get_session_override():
+        with RoutingSession(engine, engine) as session:
+            yield session
+
+    with TestClient(app) as client:
+        app.dependency_overrides[get_session] = get_session_override
+        audit_log.engine = engine
+        yield client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def account(session):
+    account = Account(
+        username='tester', email='tester@example.com', password='unused'
+    )
+    session.add(account)
+    session.commit()
+    session.refresh(account)
+    return account
+
+
+@pytest.fixture
+def token(account):
+    return create_access_token(data_payload={'sub': account.email})
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def headers(token):
+    return bearer(token)
+
+
+@pytest.fixture
+def seed(session):
+    """
+    Returns a function that fills the catalog with ``size`` novelists,
+    each with ``size`` books.
+    """
+
+    def seed_catalog(size: int) -> list[Novelist]:
+        novelists = []
+        for n in range(size):
+            novelist = Novelist(name=f'novelist {n}')
+            novelist.books = [
+                Books(year=1900 + b, title=f'book {n}-{b}', novelist_id=None)
+                for b in range(size)
+            ]
+            novelist.book_count = size
+            novelists.append(novelist)
+
+        session.add_all(novelists)
+        session.commit()
+        return novelists
+
+    return seed_catalog
+
+
+@pytest.fixture
+def query_counter(engine):
+    return QueryCounter(engine)
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import anyio
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from madrproject.config.admission import AdmissionMiddleware
+
+MAX_WAIT = 0.05
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def build_app(release: anyio.Event):
+    async def slow(request):
+        await release.wait()
+        return PlainTextResponse('done')
+
+    app = Starlette(routes=[Route('/slow/', slow)])
+    return AdmissionMiddleware(app, max_concurrency=1, max_wait=MAX_WAIT)
+
+
+@pytest.mark.anyio
+async def test_request_waiting_too_long_is_shed():
+    release = anyio.Event()
+    app = build_app(release)
+    transport = httpx.ASGITransport(app=app)
+    responses = []
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://test'
+    ) as client:
+
+        async def get():
+            responses.append(await client.get('/slow/'))
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get)
+            await anyio.sleep(0.01)
+            shed = await client.get('/slow/')
+            assert app.stats.snapshot()['in_flight'] == 1
+            release.set()
+
+    assert shed.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert shed.headers['retry-after'] == '1'
+    assert responses[0].status_code == HTTPStatus.OK
+
+    stats = app.stats.snapshot()
+    assert stats['admitted'] == 1
+    assert stats['rejected'] == 1
+    assert stats['waiting'] == 0
+    assert stats['in_flight'] == 0
+    assert stats['max_wait_seconds'] >= MAX_WAIT
+
+
+@pytest.mark.anyio
+async def test_queued_request_is_admitted_when_a_slot_frees():
+    release = anyio.Event()
+    app = build_app(release)
+    app.max_wait = 5
+    transport = httpx.ASGITransport(app=app)
+    responses = []
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://test'
+    ) as client:
+
+        async def get():
+            responses.append(await client.get('/slow/'))
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(get)
+            tasks.start_soon(get)
+            await anyio.sleep(0.01)
+            assert app.stats.snapshot()['waiting'] == 1
+            release.set()
+
+    assert [r.status_code for r in responses] == [HTTPStatus.OK] * 2
+    assert app.stats.snapshot()['admitted'] == len(responses)
@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event, select
+
+from madrproject import AuditEvent
+from madrproject.audit.log import AuditLog, audit_log
+from madrproject.config.database import utcnow
+from madrproject.config.metrics import metrics
+
+EVENTS = 5
+QUEUE_SIZE = 2
+
+
+@pytest.fixture
+def audited(client, monkeypatch):
+    # The test engine shares one connection between threads: keep the
+    # events queued until the test stops the writer.
+    monkeypatch.setattr(audit_log, 'flush_interval', 60)
+
+
+def trail(session):
+    return [
+        (row.actor_id, row.action, row.entity, row.changes)
+        for row in session.scalars(select(AuditEvent).order_by(AuditEvent.id))
+    ]
+
+
+def make_events(count):
+    return [
+        {
+            'occurred_at': utcnow(),
+            'actor_id': None,
+            'action': 'create',
+            'entity': 'book',
+            'entity_id': n,
+            'changes': {'title': [None, f'book {n}']},
+        }
+        for n in range(count)
+    ]
+
+
+def test_changes_are_audited(audited, client, headers, session, account):
+    novelist = client.post('/novelist/', json={'name': 'novelist'}).json()
+    book = client.post(
+        '/book/',
+        json={'title': 'book', 'year': 1900, 'novelist_id': novelist['id']},
+        headers=headers,
+    ).json()
+    client.patch(f'/book/{book["id"]}', json={'year': 1901}, headers=headers)
+    client.delete(f'/novelist/{novelist["id"]}', headers=headers)
+
+    audit_log.stop()
+
+    events = trail(session)
+    assert events[:3] == [
+        (None, 'create', 'novelist', {'name': [None, 'novelist']}),
+        (
+            account.id,
+            'create',
+            'book',
+            {
+                'title': [None, 'book'],
+                'year': [None, 1900],
+                'novelist_id': [None, novelist['id']],
+            },
+        ),
+        (account.id, 'update', 'book', {'year': [1900, 1901]}),
+    ]
+    # The novelist and its cascaded book are deleted in the same flush.
+    assert sorted(events[3:], key=lambda row: row[2]) == [
+        (
+            account.id,
+            'delete',
+            'book',
+            {
+                'title': ['book', None],
+                'year': [1901, None],
+                'novelist_id': [novelist['id'], None],
+            },
+        ),
+        (account.id, 'delete', 'novelist', {'name': ['novelist', None]}),
+    ]
+
+
+def test_rolled_back_batch_is_not_audited(audited, client, headers, session):
+    response = client.post(
+        '/batch/',
+        json={
+            'operations': [
+                {'op': 'create', 'entity': 'novelist', 'data': {'name': 'x'}},
+                {'op': 'delete', 'entity': 'novelist', 'id': 999},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    audit_log.stop()
+    assert trail(session) == []
+
+
+def test_events_are_written_in_batches_and_flushed_on_stop(engine, session):
+    inserts = []
+    event.listen(
+        engine,
+        'before_cursor_execute',
+        lambda conn, cursor, statement, *args: (
+            statement.startswith('INSERT') and inserts.append(statement)
+        ),
+    )
+    log = AuditLog(
+        max_size=100, batch_size=2, flush_interval=60, enqueue_timeout=0
+    )
+
+    log.put(make_events(EVENTS))
+    log.start(engine)
+    log.stop()
+
+    assert len(session.scalars(select(AuditEvent)).all()) == EVENTS
+    # Two full batches, then the remainder written on stop.
+    assert len(inserts) == 3  # noqa: PLR2004
+
+
+def test_full_queue_drops_events(engine, session):
+    log = AuditLog(
+        max_size=QUEUE_SIZE,
+        batch_size=10,
+        flush_interval=0,
+        enqueue_timeout=0.01,
+    )
+    dropped = {
+        'labels': {'outcome': 'dropped'},
+        'value': EVENTS - QUEUE_SIZE,
+    }
+    before = metrics.snapshot().get('audit_events_total', [])
+
+    log.put(make_events(EVENTS))
+    log.start(engine)
+    log.stop()
+
+    assert len(session.scalars(select(AuditEvent)).all()) == QUEUE_SIZE
+    assert dropped in metrics.snapshot()['audit_events_total']
+    assert dropped not in before
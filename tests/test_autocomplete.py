@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import delete, insert
+
+from madrproject import Books
+from madrproject.changes.repository import ChangesRepository
+from madrproject.changes.sequence import next_change_seq
+from madrproject.config.autocomplete import indexes
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    for index in indexes.values():
+        index.clear()
+    yield
+    for index in indexes.values():
+        index.clear()
+
+
+def test_book_autocomplete_matches_prefix_in_order(client, headers, seed):
+    seed(3)
+
+    response = client.get('/book/autocomplete?q=Book 1-', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert [s['title'] for s in response.json()['suggestions']] == [
+        'book 1-0',
+        'book 1-1',
+        'book 1-2',
+    ]
+
+
+def test_suggestions_keep_the_stored_text(client, headers, session, seed):
+    book = seed(1)[0].books[0]
+    client.patch(
+        f'/book/{book.id}', json={'title': 'Straße Grande'}, headers=headers
+    )
+    session.refresh(book)
+
+    response = client.get('/book/autocomplete?q=STRASSE', headers=headers)
+
+    assert book.title != book.title.casefold()
+    assert [s['title'] for s in response.json()['suggestions']] == [book.title]
+
+
+def test_index_follows_writes(client, headers):
+    client.post('/novelist/', json={'name': 'machado'})
+    created = client.post('/novelist/', json={'name': 'mario'}).json()
+    client.patch(
+        f'/novelist/{created["id"]}',
+        json={'name': 'clarice'},
+        headers=headers,
+    )
+    client.post(
+        '/book/',
+        json={'title': 'Dom Casmurro', 'year': 1899, 'novelist_id': 1},
+        headers=headers,
+    )
+
+    novelists = client.get('/novelist/autocomplete?q=ma', headers=headers)
+    books = client.get('/book/autocomplete?q=dom', headers=headers)
+
+    assert [s['name'] for s in novelists.json()['suggestions']] == ['machado']
+    assert [s['title'] for s in books.json()['suggestions']] == [
+        'dom casmurro'
+    ]
+
+    client.delete('/novelist/1', headers=headers)
+    books = client.get('/book/autocomplete?q=dom', headers=headers)
+    assert books.json()['suggestions'] == []
+
+
+def test_rolled_back_batch_is_not_indexed(client, headers):
+    client.get('/novelist/autocomplete?q=x', headers=headers)
+
+    response = client.post(
+        '/batch/',
+        json={
+            'operations': [
+                {'op': 'create', 'entity': 'novelist', 'data': {'name': 'x'}},
+                {'op': 'delete', 'entity': 'novelist', 'id': 999},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    novelists = client.get('/novelist/autocomplete?q=x', headers=headers)
+    assert novelists.json()['suggestions'] == []
+
+
+def test_full_index_falls_back_to_query(client, headers, seed):
+    seed(3)
+    index = indexes[Books]
+    max_entries, index.max_entries = index.max_entries, 4
+
+    try:
+        response = client.get('/book/autocomplete?q=book 2', headers=headers)
+    finally:
+        index.max_entries = max_entries
+
+    assert index.stats()['complete'] is False
+    assert [s['title'] for s in response.json()['suggestions']] == [
+        'book 2-0',
+        'book 2-1',
+        'book 2-2',
+    ]
+
+
+def test_index_catches_up_with_other_workers(client, headers, session, seed):
+    novelist = seed(1)[0]
+    removed = novelist.books[0].id
+    index = indexes[Books]
+    client.get('/book/autocomplete?q=x', headers=headers)
+
+    # Core statements bypass the ORM hooks, like a write made by another
+    # worker process.
+    changes = ChangesRepository(session)
+    session.execute(
+        insert(Books).values(
+            title='Quincas Borba',
+            year=1891,
+            novelist_id=novelist.id,
+            change_seq=next_change_seq(session),
+        )
+    )
+    session.execute(delete(Books).where(Books.id == removed))
+    changes.record_deletions('book', [removed])
+    session.commit()
+
+    stale = client.get('/book/autocomplete?q=quincas', headers=headers)
+    assert stale.json()['suggestions'] == []
+
+    index.catch_up(session)
+
+    fresh = client.get('/book/autocomplete?q=quincas', headers=headers)
+    assert [s['title'] for s in fresh.json()['suggestions']] == [
+        'Quincas Borba'
+    ]
+    assert index.search(session, 'book 0-', limit=10) == []
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from madrproject import Books, Novelist
+
+
+def run_batch(client, headers, *operations):
+    return client.post(
+        '/batch/', json={'operations': list(operations)}, headers=headers
+    )
+
+
+def test_references_resolve_to_earlier_ids(client, headers, session):
+    response = run_batch(
+        client,
+        headers,
+        {'op': 'create', 'entity': 'novelist', 'data': {'name': 'machado'}},
+        {
+            'op': 'create',
+            'entity': 'book',
+            'data': {'title': 'helena', 'year': 1876, 'novelist_id': '$0'},
+        },
+        {'op': 'update', 'entity': 'book', 'id': '$1', 'data': {'year': 1877}},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    novelist, created, updated = (
+        result['data'] for result in response.json()['results']
+    )
+    assert created['novelist_id'] == novelist['id']
+    assert updated == {**created, 'year': 1877, 'version_id': 2}
+
+    book = session.scalar(select(Books))
+    assert (book.novelist_id, book.year) == (novelist['id'], 1877)
+    assert session.get(Novelist, novelist['id']).book_count == 1
+
+
+@pytest.mark.parametrize(
+    'reference',
+    [
+        '$1',  # the operation itself
+        '$2',  # a later operation
+        '$x',
+        '$-1',
+    ],
+)
+def test_bad_references_are_rejected(client, headers, session, reference):
+    response = run_batch(
+        client,
+        headers,
+        {'op': 'create', 'entity': 'novelist', 'data': {'name': 'machado'}},
+        {
+            'op': 'create',
+            'entity': 'book',
+            'data': {
+                'title': 'helena',
+                'year': 1876,
+                'novelist_id': reference,
+            },
+        },
+        {'op': 'create', 'entity': 'novelist', 'data': {'name': 'alencar'}},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail']['index'] == 1
+    assert session.scalars(select(Novelist)).all() == []
+
+
+def test_failing_operation_rolls_back_the_whole_batch(
+    client, headers, session, seed
+):
+    existing = seed(1)[0]
+
+    response = run_batch(
+        client,
+        headers,
+        {'op': 'create', 'entity': 'novelist', 'data': {'name': 'machado'}},
+        {
+            'op': 'create',
+            'entity': 'book',
+            'data': {'title': 'helena', 'year': 1876, 'novelist_id': '$0'},
+        },
+        {'op': 'delete', 'entity': 'book', 'id': existing.books[0].id},
+        {'op': 'delete', 'entity': 'novelist', 'id': 999},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json()['detail']['index'] == 3  # noqa: PLR2004
+    session.expire_all()
+    assert session.scalars(select(Novelist.name)).all() == ['novelist 0']
+    assert session.scalars(select(Books.title)).all() == ['book 0-0']
+    assert session.get(Novelist, existing.id).book_count == 1
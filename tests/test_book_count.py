@@ -0,0 +1,96 @@
+from functools import partial
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import update
+
+from madrproject import Novelist
+from madrproject.config.database import RoutingSession
+from madrproject.novelists import consistency
+from madrproject.novelists.consistency import (
+    find_book_count_drift,
+    main,
+    repair_book_counts,
+)
+
+
+@pytest.fixture
+def drifted(session, seed):
+    """
+    Two novelists with two books each, the first counter off by three.
+    """
+    novelists = seed(2)
+    session.execute(
+        update(Novelist)
+        .where(Novelist.id == novelists[0].id)
+        .values(book_count=5)
+    )
+    session.commit()
+    return novelists
+
+
+def book_count(client, headers, novelist_id):
+    return client.get(f'/novelist/{novelist_id}', headers=headers).json()[
+        'book_count'
+    ]
+
+
+def test_book_count_follows_creates_and_deletes(client, headers):
+    novelist = client.post('/novelist/', json={'name': 'machado'}).json()
+    books = [
+        client.post(
+            '/book/',
+            json={
+                'title': title,
+                'year': 1881 + n,
+                'novelist_id': novelist['id'],
+            },
+            headers=headers,
+        ).json()
+        for n, title in enumerate(['memórias póstumas', 'quincas borba'])
+    ]
+    assert book_count(client, headers, novelist['id']) == len(books)
+
+    client.delete(f'/book/{books[0]["id"]}', headers=headers)
+    assert book_count(client, headers, novelist['id']) == 1
+
+
+def test_list_sorts_by_book_count(client, headers, session, seed):
+    novelists = seed(2)
+    client.delete(f'/book/{novelists[0].books[0].id}', headers=headers)
+
+    response = client.get(
+        '/novelist/', params={'sort': 'book_count'}, headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [n['id'] for n in response.json()['novelists']] == [
+        novelists[0].id,
+        novelists[1].id,
+    ]
+
+
+def test_drift_is_found_and_repaired(session, drifted):
+    [row] = find_book_count_drift(session)
+    assert (row.id, row.book_count, row.actual) == (drifted[0].id, 5, 2)
+
+    repair_book_counts(session, [row.id])
+
+    assert find_book_count_drift(session) == []
+    session.expire_all()
+    assert session.get(Novelist, drifted[0].id).book_count == 2  # noqa: PLR2004
+
+
+def test_command_reports_and_fixes_drift(
+    engine, session, drifted, monkeypatch, capsys
+):
+    monkeypatch.setattr(
+        consistency, 'RoutingSession', partial(RoutingSession, engine, engine)
+    )
+
+    assert main([]) == 1
+    assert 'stored 5, actual 2' in capsys.readouterr().out
+
+    assert main(['--fix']) == 0
+    assert main([]) == 0
+    assert 'All book counters are consistent.' in capsys.readouterr().out
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event
+
+from madrproject.books.repository import BooksRepository
+from madrproject.books.schemas import BookListQuery
+
+
+@pytest.fixture
+def bibliography(session, seed):
+    novelists = seed(2)
+    novelists[0].books[0].year = 1950
+    session.commit()
+    return novelists[0]
+
+
+@pytest.mark.parametrize(
+    ('sort', 'expected_years'),
+    [
+        ('year', [1901, 1950]),
+        ('-year', [1950, 1901]),
+    ],
+)
+def test_bibliography_by_year(
+    client, token, bibliography, sort, expected_years
+):
+    response = client.get(
+        '/book/',
+        params={'novelist_id': bibliography.id, 'sort': sort, 'limit': 10},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    books = response.json()['books']
+    assert {book['novelist_id'] for book in books} == {bibliography.id}
+    assert [book['year'] for book in books] == expected_years
+
+
+@pytest.mark.parametrize('sort', ['year', '-year'])
+def test_bibliography_is_an_index_range_scan(engine, session, seed, sort):
+    seed(2)
+    emitted = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        emitted.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        BooksRepository(session).list_books(
+            BookListQuery(novelist_id=1, sort=sort, limit=10)
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    [(statement, parameters)] = emitted
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(
+            f'EXPLAIN QUERY PLAN {statement}', parameters
+        ).all()
+    details = ' '.join(row[-1] for row in plan)
+
+    assert 'ix_books_novelist_id_year_id' in details
+    assert 'TEMP B-TREE' not in details
+
+
+def test_sort_rejects_unknown_fields(client, token):
+    response = client.get(
+        '/book/',
+        params={'sort': 'novelist'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
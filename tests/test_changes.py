@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from madrproject import Books, Novelist
+from madrproject.changes.sequence import committed_position
+
+
+def test_late_commit_with_old_timestamp_is_not_skipped(
+    client, token, session, seed
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    book = seed(2)[0].books[0]
+    cursor = client.get('/book/changes', headers=headers).json()['cursor']
+
+    # A row stamped before the cursor was issued, e.g. flushed early and
+    # committed late, or written by a worker whose clock is behind.
+    book.title = 'committed late'
+    book.updated_at = datetime(2000, 1, 1)
+    session.commit()
+
+    response = client.get(
+        '/book/changes', params={'since': cursor}, headers=headers
+    )
+
+    assert [change['title'] for change in response.json()['changes']] == [
+        'committed late'
+    ]
+
+
+def test_deletions_follow_the_cursor(client, token, seed):
+    headers = {'Authorization': f'Bearer {token}'}
+    book = seed(1)[0].books[0]
+    cursor = client.get('/book/changes', headers=headers).json()['cursor']
+
+    client.delete(f'/book/{book.id}', headers=headers)
+    response = client.get(
+        '/book/changes', params={'since': cursor}, headers=headers
+    )
+
+    assert response.json()['deleted'] == [book.id]
+
+
+def test_transaction_rows_share_one_sequence_number(session):
+    first = Novelist(name='first')
+    first.books = [
+        Books(year=1900, title=f'book {n}', novelist_id=None) for n in range(2)
+    ]
+    session.add(first)
+    session.commit()
+
+    second = Novelist(name='second')
+    session.add(second)
+    session.commit()
+
+    assert {book.change_seq for book in first.books} == {first.change_seq}
+    assert second.change_seq == first.change_seq + 1
+
+
+def test_rows_past_the_committed_position_are_held_back(
+    client, token, session, seed
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    book = seed(1)[0].books[0]
+    cursor = client.get('/book/changes', headers=headers).json()['cursor']
+
+    # Numbered above the horizon, as the rows of a transaction that is
+    # still running would be on PostgreSQL.
+    session.execute(
+        update(Books)
+        .where(Books.id == book.id)
+        .values(title='not yet', change_seq=committed_position(session) + 1)
+    )
+    session.commit()
+
+    response = client.get(
+        '/book/changes', params={'since': cursor}, headers=headers
+    )
+
+    assert response.json()['changes'] == []
+    assert response.json()['cursor'] == cursor
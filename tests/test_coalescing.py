@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from madrproject.config.coalescing import SingleFlight, key_label
+
+CALLERS = 8
+KEY = ('list', 3, 0)
+
+
+class WaiterCountingEvent(threading.Event):
+    def __init__(self):
+        super().__init__()
+        self.waiters = 0
+
+    def wait(self, timeout=None):
+        self.waiters += 1
+        return super().wait(timeout)
+
+
+class SlowRead:
+    """
+    Read that blocks until released, so callers pile up behind it.
+    """
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.entered.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return f'result {self.calls}'
+
+
+def run_concurrently(flight, read, callers=CALLERS):
+    """
+    Starts a leader, waits until every follower is waiting on it, then
+    lets the leader finish. Returns each caller's result or exception.
+    """
+
+    def call():
+        try:
+            return flight.do(KEY, read)
+        except Exception as error:
+            return error
+
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        leader = pool.submit(call)
+        read.entered.wait(5)
+        done = flight._calls[KEY].done = WaiterCountingEvent()
+
+        followers = [pool.submit(call) for _ in range(callers - 1)]
+        deadline = time.monotonic() + 5
+        while done.waiters < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        read.release.set()
+
+        return [future.result() for future in [leader, *followers]]
+
+
+@pytest.fixture
+def flight():
+    return SingleFlight('test', timeout=5)
+
+
+def test_concurrent_callers_share_one_call(flight):
+    read = SlowRead()
+
+    results = run_concurrently(flight, read)
+
+    assert read.calls == 1
+    assert results == ['result 1'] * CALLERS
+    assert flight.stats()['keys'][key_label(KEY)] == {
+        'leader': 1,
+        'shared': CALLERS - 1,
+    }
+
+
+def test_leader_error_reaches_every_caller(flight):
+    error = RuntimeError('database is gone')
+    read = SlowRead(error)
+
+    results = run_concurrently(flight, read)
+
+    assert read.calls == 1
+    assert all(result is error for result in results)
+
+
+@pytest.mark.parametrize('error', [None, RuntimeError('database is gone')])
+def test_key_is_released_after_the_call(flight, error):
+    read = SlowRead(error)
+    read.release.set()
+
+    for _ in range(2):
+        try:
+            flight.do(KEY, read)
+        except RuntimeError:
+            pass
+
+    assert read.calls == 2  # noqa: PLR2004
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_follower_stops_waiting_after_the_timeout():
+    flight = SingleFlight('test', timeout=0.01)
+    read = SlowRead()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, KEY, read)
+        read.entered.wait(5)
+
+        assert flight.do(KEY, lambda: 'own result') == 'own result'
+        read.release.set()
+        assert leader.result() == 'result 1'
+
+    assert flight.stats()['keys'][key_label(KEY)] == {
+        'leader': 1,
+        'timeout': 1,
+    }
+
+
+def test_stats_do_not_expose_the_parameters(flight):
+    flight.do(('list', 'title=my-private-search'), lambda: 'result')
+
+    [label] = flight.stats()['keys']
+    assert label.startswith('list:')
+    assert 'private' not in label
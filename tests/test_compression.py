@@ -0,0 +1,148 @@
+import json
+from http import HTTPStatus
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from madrproject.config.compression import CompressionMiddleware, negotiate
+from madrproject.config.security import get_password_hash
+
+PAGE_SIZE = 100
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected'),
+    [
+        ('gzip, deflate', 'gzip'),
+        ('br;q=0.5, gzip;q=0.8', 'gzip'),
+        ('br, gzip;q=0.8', 'br'),
+        ('*', 'br'),
+        ('*, br;q=0', 'gzip'),
+        ('gzip;q=0', None),
+        ('identity', None),
+        ('', None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ['br', 'gzip']) == expected
+
+
+def test_large_list_is_compressed(client, token, seed):
+    seed(20)
+
+    response = client.get(
+        f'/book/?limit={PAGE_SIZE}',
+        headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': 'gzip',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert len(response.json()['books']) == PAGE_SIZE
+    assert int(response.headers['content-length']) < len(response.content)
+
+
+def test_small_response_is_not_compressed(client):
+    response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'content-encoding' not in response.headers
+
+
+def test_token_is_never_compressed(client, session, account):
+    account.password = get_password_hash('secret')
+    session.commit()
+
+    response = client.post(
+        '/auth/token/',
+        data={'username': account.email, 'password': 'secret'},
+        headers={'Accept-Encoding': 'gzip'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'content-encoding' not in response.headers
+
+
+@pytest.mark.anyio
+async def test_streamed_response_is_compressed_per_chunk():
+    rows = [{'id': n, 'title': f'book {n}'} for n in range(500)]
+
+    async def stream(request):
+        async def lines():
+            for row in rows:
+                yield json.dumps(row) + '\n'
+
+        return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+    app = CompressionMiddleware(
+        Starlette(routes=[Route('/stream/', stream)]),
+        minimum_size=1024,
+        offload_size=4096,
+    )
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url='http://test'
+    ) as client:
+        response = await client.get(
+            '/stream/', headers={'Accept-Encoding': 'gzip'}
+        )
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == rows
+
+
+async def fetch(route):
+    app = CompressionMiddleware(
+        Starlette(routes=[Route('/', route)]),
+        minimum_size=1024,
+        offload_size=4096,
+    )
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url='http://test'
+    ) as client:
+        return await client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+
+@pytest.mark.anyio
+async def test_short_stream_is_not_compressed():
+    async def stream(request):
+        async def chunks():
+            yield 'short '
+            yield 'stream'
+
+        return StreamingResponse(chunks())
+
+    response = await fetch(stream)
+
+    assert 'content-encoding' not in response.headers
+    assert response.text == 'short stream'
+
+
+@pytest.mark.parametrize(
+    ('etag', 'expected'), [('"3"', '"3-gzip"'), ('W/"3"', 'W/"3"')]
+)
+@pytest.mark.anyio
+async def test_compressed_response_has_an_encoding_specific_etag(
+    etag, expected
+):
+    async def page(request):
+        return PlainTextResponse('x' * 2048, headers={'ETag': etag})
+
+    response = await fetch(page)
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['etag'] == expected
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from madrproject import Books, Novelist
+from madrproject.books.repository import BooksRepository
+from madrproject.novelists.repository import NovelistRepository
+
+
+@pytest.fixture
+def book(seed):
+    return seed(1)[0].books[0]
+
+
+def test_patch_returns_new_etag(client, token, book):
+    response = client.patch(
+        f'/book/{book.id}',
+        json={'year': 2000},
+        headers={'Authorization': f'Bearer {token}', 'If-Match': '"1"'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] == '"2"'
+    assert response.json()['version_id'] == 2  # noqa: PLR2004
+
+
+def test_patch_with_stale_if_match_is_rejected(client, token, book, session):
+    headers = {'Authorization': f'Bearer {token}', 'If-Match': '"1"'}
+    client.patch(f'/book/{book.id}', json={'year': 2000}, headers=headers)
+
+    response = client.patch(
+        f'/book/{book.id}', json={'year': 2001}, headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    session.expire_all()
+    assert session.get(Books, book.id).year == 2000  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ('if_match', 'status'),
+    [
+        ('"1"', HTTPStatus.OK),
+        ('"1-gzip"', HTTPStatus.OK),
+        ('"0", "1-br"', HTTPStatus.OK),
+        ('W/"1"', HTTPStatus.PRECONDITION_FAILED),
+        ('"1-deflate"', HTTPStatus.PRECONDITION_FAILED),
+    ],
+)
+def test_if_match_compares_strongly(client, token, book, if_match, status):
+    response = client.patch(
+        f'/book/{book.id}',
+        json={'year': 2000},
+        headers={'Authorization': f'Bearer {token}', 'If-Match': if_match},
+    )
+
+    assert response.status_code == status
+
+
+def test_novelist_etag_round_trip(client, token, seed):
+    novelist = seed(1)[0]
+    headers = {'Authorization': f'Bearer {token}'}
+
+    read = client.get(f'/novelist/{novelist.id}', headers=headers)
+    response = client.patch(
+        f'/novelist/{novelist.id}',
+        json={'name': 'renamed'},
+        headers={**headers, 'If-Match': read.headers['ETag']},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != read.headers['ETag']
+
+
+def test_concurrent_update_loses_without_locking(engine, book):
+    with Session(engine) as first, Session(engine) as second:
+        first_book = first.get(Books, book.id)
+        second_book = second.get(Books, book.id)
+
+        BooksRepository(first).update_book(first_book, {'year': 2000})
+
+        with pytest.raises(StaleDataError):
+            BooksRepository(second).update_book(second_book, {'year': 2001})
+
+
+@pytest.fixture(params=['book', 'novelist'])
+def racing_target(request, book, monkeypatch):
+    """
+    Makes another request update the row between its read and its delete.
+    """
+    entity = request.param
+    model, repository, target = {
+        'book': (Books, BooksRepository, book),
+        'novelist': (Novelist, NovelistRepository, book.novelist),
+    }[entity]
+    read = getattr(repository, f'get_{entity}_by_id')
+
+    def read_then_race(self, row_id):
+        row = read(self, row_id)
+        self.session.execute(
+            update(model)
+            .where(model.id == row_id)
+            .values(version_id=model.version_id + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return row
+
+    monkeypatch.setattr(repository, f'get_{entity}_by_id', read_then_race)
+    return entity, model, target.id
+
+
+def test_delete_racing_an_update_is_rejected(
+    client, token, session, racing_target
+):
+    entity, model, target_id = racing_target
+
+    response = client.delete(
+        f'/{entity}/{target_id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    session.expire_all()
+    assert session.get(model, target_id) is not None
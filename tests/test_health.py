@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+from sqlalchemy import create_engine, event
+
+from madrproject.config.statements import HOT_STATEMENTS
+from madrproject.health.checks import ReadinessCheck, precompile_statements
+
+
+def test_liveness(client):
+    response = client.get('/health/live')
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_readiness_reports_database_and_pool(client):
+    response = client.get('/health/ready')
+
+    assert response.status_code == HTTPStatus.OK
+    body = response.json()
+    assert body['database']['reachable'] is True
+    assert 'class' in body['pool']
+
+
+def test_readiness_check_is_cached(engine):
+    pings = []
+    event.listen(engine, 'before_cursor_execute', lambda *a: pings.append(1))
+    readiness = ReadinessCheck(engine, cache_seconds=60)
+    readiness.mark_started()
+
+    results = [readiness.check() for _ in range(5)]
+
+    assert all(result['ready'] for result in results)
+    assert len(pings) == 1
+
+
+def test_not_ready_before_startup_or_without_database(tmp_path):
+    unreachable = create_engine(f'sqlite:///{tmp_path}/missing/db.sqlite')
+    readiness = ReadinessCheck(unreachable, cache_seconds=0)
+
+    assert readiness.check()['ready'] is False
+    readiness.mark_started()
+    assert readiness.check()['database']['reachable'] is False
+
+
+def test_precompile_fills_the_statement_cache(engine):
+    precompile_statements(engine)
+
+    assert len(engine._compiled_cache) >= len(HOT_STATEMENTS)
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import anyio
+import httpx
+import pytest
+from sqlalchemy import select
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from madrproject import IdempotencyRecord
+from madrproject.config.database import utcnow
+from madrproject.idempotency.middleware import IdempotencyMiddleware
+from madrproject.idempotency.store import (
+    DatabaseStore,
+    MemoryStore,
+    StoredResponse,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+class Catalog:
+    """
+    Application counting the requests that reach it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.created = []
+        self.entered = anyio.Event()
+        self.release = None
+
+    async def create(self, request):
+        self.created.append(await request.json())
+        self.entered.set()
+        if self.release is not None:
+            await self.release.wait()
+        return JSONResponse(
+            {'id': len(self.created)}, status_code=HTTPStatus.CREATED
+        )
+
+    def client(self, address='10.0.0.1'):
+        app = IdempotencyMiddleware(
+            Starlette(routes=[Route('/book/', self.create, methods=['POST'])]),
+            store=self.store,
+            paths={'/book/'},
+        )
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app, client=(address, 1234)),
+            base_url='http://test',
+        )
+
+
+@pytest.fixture
+def catalog():
+    return Catalog(MemoryStore(ttl=60, max_entries=100))
+
+
+def post(client, body, key='key-1', **headers):
+    return client.post(
+        '/book/', json=body, headers={'Idempotency-Key': key, **headers}
+    )
+
+
+@pytest.mark.anyio
+async def test_retry_replays_the_stored_response(catalog):
+    async with catalog.client() as client:
+        first = await post(client, {'title': 'book'})
+        retry = await post(client, {'title': 'book'})
+
+    assert retry.status_code == first.status_code == HTTPStatus.CREATED
+    assert retry.json() == first.json()
+    assert retry.headers['idempotent-replayed'] == 'true'
+    assert catalog.created == [{'title': 'book'}]
+
+
+@pytest.mark.anyio
+async def test_reused_key_with_another_body_is_rejected(catalog):
+    async with catalog.client() as client:
+        await post(client, {'title': 'book'})
+        response = await post(client, {'title': 'other book'})
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert catalog.created == [{'title': 'book'}]
+
+
+@pytest.mark.anyio
+async def test_key_in_flight_is_a_conflict(catalog):
+    catalog.release = anyio.Event()
+    responses = []
+
+    async with catalog.client() as client, anyio.create_task_group() as tg:
+
+        async def first():
+            responses.append(await post(client, {'title': 'book'}))
+
+        tg.start_soon(first)
+        await catalog.entered.wait()
+        conflict = await post(client, {'title': 'book'})
+        catalog.release.set()
+
+    assert conflict.status_code == HTTPStatus.CONFLICT
+    assert responses[0].status_code == HTTPStatus.CREATED
+    assert len(catalog.created) == 1
+
+
+@pytest.mark.anyio
+async def test_anonymous_keys_are_scoped_by_client(catalog):
+    async with catalog.client('10.0.0.1') as first:
+        await post(first, {'title': 'book'})
+    async with catalog.client('10.0.0.2') as second:
+        response = await post(second, {'title': 'other book'})
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert 'idempotent-replayed' not in response.headers
+    assert len(catalog.created) == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_keys_are_scoped_by_credentials(catalog):
+    async with catalog.client() as client:
+        await post(client, {'title': 'book'}, Authorization='Bearer a')
+        response = await post(
+            client, {'title': 'other book'}, Authorization='Bearer b'
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert len(catalog.created) == 2  # noqa: PLR2004
+
+
+def test_expired_database_entries_are_purged(engine, session):
+    store = DatabaseStore(engine, ttl=60, lease=10)
+    store.reserve('expired', 'fingerprint')
+    store.reserve('current', 'fingerprint')
+    session.get(IdempotencyRecord, 'expired').expires_at = utcnow() - (
+        timedelta(seconds=1)
+    )
+    session.commit()
+
+    assert store.purge_expired() == 1
+    assert session.scalars(select(IdempotencyRecord.key)).all() == ['current']
+
+
+def test_reservation_only_lasts_its_lease(engine, session):
+    store = DatabaseStore(engine, ttl=60 * 60, lease=10)
+    store.reserve('abandoned', 'fingerprint')
+    store.reserve('completed', 'fingerprint')
+    store.complete('completed', StoredResponse('fingerprint', status=201))
+
+    leases = {
+        record.key: record.expires_at - utcnow()
+        for record in session.scalars(select(IdempotencyRecord))
+    }
+
+    assert leases['abandoned'] <= timedelta(seconds=10)
+    assert leases['completed'] > timedelta(minutes=59)
+
+
+def test_abandoned_reservation_can_be_taken_again(engine, session):
+    store = DatabaseStore(engine, ttl=60 * 60, lease=10)
+    store.reserve('abandoned', 'fingerprint')
+    session.get(IdempotencyRecord, 'abandoned').expires_at = utcnow()
+    session.commit()
+
+    assert store.reserve('abandoned', 'fingerprint')
@@ -0,0 +1,57 @@
+import time
+
+from madrproject.config.maintenance import Maintenance
+from madrproject.config.metrics import metrics
+
+
+def test_due_jobs_run_and_are_rescheduled(monkeypatch):
+    now = [time.monotonic()]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    runs = []
+    maintenance = Maintenance()
+    maintenance.register('purge', 10, lambda: runs.append('purge'))
+    maintenance.register('reload', 30, lambda: runs.append('reload'))
+
+    assert maintenance.run_pending() == 10  # noqa: PLR2004
+    assert runs == []
+
+    now[0] += 10
+    assert maintenance.run_pending() == 10  # noqa: PLR2004
+    now[0] += 20
+    maintenance.run_pending()
+
+    assert runs == ['purge', 'purge', 'reload']
+
+
+def test_failing_job_is_counted_and_retried(monkeypatch):
+    now = [time.monotonic()]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    maintenance = Maintenance()
+
+    def broken():
+        raise RuntimeError('database is gone')
+
+    maintenance.register('broken', 5, broken)
+    now[0] += 5
+    maintenance.run_pending()
+
+    assert {
+        'labels': {'job': 'broken', 'outcome': 'failed'},
+        'value': 1,
+    } in metrics.snapshot()['maintenance_runs_total']
+    assert maintenance.run_pending() == 5  # noqa: PLR2004
+
+
+def test_thread_runs_jobs_until_stopped():
+    maintenance = Maintenance()
+    runs = []
+    maintenance.register('tick', 0.01, lambda: runs.append(1))
+
+    maintenance.start()
+    time.sleep(0.1)
+    maintenance.stop()
+    stopped_at = len(runs)
+    time.sleep(0.05)
+
+    assert stopped_at > 0
+    assert len(runs) == stopped_at
@@ -0,0 +1,33 @@
+from http import HTTPStatus
+
+import pytest
+
+from madrproject.config.settings import settings
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, 'METRICS_TOKEN', 'scraper-token')
+    return 'scraper-token'
+
+
+def test_metrics_need_the_metrics_token(client, metrics_token, token):
+    for authorization in [None, f'Bearer {token}', 'Bearer wrong']:
+        headers = {'Authorization': authorization} if authorization else {}
+        response = client.get('/metrics', headers=headers)
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    response = client.get(
+        '/metrics', headers={'Authorization': f'Bearer {metrics_token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_metrics_are_closed_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, 'METRICS_TOKEN', None)
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer '})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
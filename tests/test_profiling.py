@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from madrproject.config.profiling import (
+    QUERY_START_KEY,
+    ProfilingMiddleware,
+    RequestProfile,
+    current_profile,
+    instrument_engine,
+    instrument_routes,
+    issue_trigger,
+    profile_thread,
+)
+
+SECRET = 'profiling-secret'
+
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def busy_request(request):
+    spin(0.05)
+    return PlainTextResponse('done')
+
+
+def busy_elsewhere(stopped):
+    while not stopped.is_set():
+        spin(0.001)
+
+
+def starlette_app():
+    return Starlette(routes=[Route('/busy/', profile_thread(busy_request))])
+
+
+def fastapi_app():
+    app = FastAPI()
+
+    @app.get('/busy/')
+    def busy(request: Request):
+        return busy_request(request)
+
+    instrument_routes(app)
+    return app
+
+
+@pytest.fixture(params=[starlette_app, fastapi_app])
+def profiled_client(request, tmp_path):
+    app = ProfilingMiddleware(
+        request.param(),
+        token=SECRET,
+        output_dir=str(tmp_path),
+        interval_ms=1,
+    )
+    with TestClient(app) as client:
+        yield client
+
+
+def read_report(tmp_path, response):
+    return json.loads(
+        (tmp_path / response.headers['x-profile-report']).read_text()
+    )
+
+
+def test_samples_only_the_profiled_request(profiled_client, tmp_path):
+    stopped = threading.Event()
+    other = threading.Thread(target=busy_elsewhere, args=(stopped,))
+    other.start()
+    try:
+        response = profiled_client.get(
+            '/busy/', headers={'X-Profile': issue_trigger(SECRET, ttl=60)}
+        )
+    finally:
+        stopped.set()
+        other.join()
+
+    report = read_report(tmp_path, response)
+    folded = '\n'.join(report['folded'])
+    assert report['samples'] > 0
+    assert 'busy_request' in folded
+    assert 'busy_elsewhere' not in folded
+
+
+@pytest.mark.parametrize(
+    'trigger',
+    [
+        SECRET,
+        issue_trigger(SECRET, ttl=-1),
+        issue_trigger('another-secret', ttl=60),
+        issue_trigger(SECRET, ttl=2 * 60 * 60),
+    ],
+    ids=['static-secret', 'expired', 'wrong-key', 'too-long'],
+)
+def test_invalid_triggers_are_ignored(profiled_client, tmp_path, trigger):
+    response = profiled_client.get('/busy/', headers={'X-Profile': trigger})
+
+    assert response.text == 'done'
+    assert 'x-profile-report' not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_statement_is_recorded_and_cleared():
+    engine = create_engine('sqlite://')
+    instrument_engine(engine)
+    profile = RequestProfile('GET', '/busy/', interval=1)
+    token = current_profile.set(profile)
+
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text('SELECT * FROM missing'))
+            connection.execute(text('SELECT 1'))
+
+            assert QUERY_START_KEY not in connection.connection.info
+    finally:
+        current_profile.reset(token)
+
+    assert [query.get('error') for query in profile.queries] == [
+        'OperationalError',
+        None,
+    ]
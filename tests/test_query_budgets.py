@@ -0,0 +1,218 @@
+"""
+SQL statement budgets per route.
+
+Every route is called against catalogs of increasing size and must stay
+within its declared budget, with the same number of statements whatever
+the size of the result. A route that starts issuing a query per row fails
+here before it reaches review. Run ``pytest --query-report=<file>`` to get
+the table of counts for diffing.
+"""
+
+from http import HTTPStatus
+
+import pytest
+
+from madrproject import Account
+from madrproject.auth import ratelimit
+from madrproject.auth.ratelimit import build_login_rate_limiter
+from madrproject.auth.revocation import revocations
+from madrproject.config.autocomplete import indexes
+from madrproject.config.database import metadata
+from madrproject.config.security import (
+    create_access_token,
+    create_refresh_token,
+    get_password_hash,
+    verified_tokens,
+)
+from tests.conftest import QUERY_REPORT
+
+SIZES = [1, 5, 25]
+
+PASSWORD = 'secret'
+# Hashed once: password hashing is deliberately slow.
+PASSWORD_HASH = get_password_hash(PASSWORD)
+
+
+class Form(dict):
+    """
+    Body sent as form fields instead of JSON.
+    """
+
+
+# (method, path, body, budget). Catalog writes include the UPDATE drawing
+# the change sequence number of their transaction.
+ROUTES = {
+    'GET /account/': ('get', '/account/', None, 1),
+    'POST /account/': (
+        'post',
+        '/account/',
+        {'username': 'new', 'email': 'new@example.com', 'password': 'x'},
+        3,
+    ),
+    'PUT /account/{id}': (
+        'put',
+        '/account/{account_id}',
+        {'username': 'renamed', 'email': '{email}', 'password': 'x'},
+        4,
+    ),
+    'DELETE /account/{id}': ('delete', '/account/{account_id}', None, 2),
+    'POST /auth/token/': (
+        'post',
+        '/auth/token/',
+        Form(username='{email}', password=PASSWORD),
+        1,
+    ),
+    'POST /auth/refresh_token/': ('post', '/auth/refresh_token/', None, 2),
+    'POST /auth/logout/': ('post', '/auth/logout/', None, 2),
+    'POST /batch/': (
+        'post',
+        '/batch/',
+        {
+            'operations': [
+                {'op': 'create', 'entity': 'novelist', 'data': {'name': 'x'}},
+                {
+                    'op': 'update',
+                    'entity': 'book',
+                    'id': '{book_id}',
+                    'data': {'year': 2001},
+                },
+                {'op': 'delete', 'entity': 'book', 'id': '{other_book_id}'},
+            ]
+        },
+        10,
+    ),
+    'POST /novelist/': ('post', '/novelist/', {'name': 'new novelist'}, 5),
+    'GET /novelist/autocomplete': (
+        'get',
+        '/novelist/autocomplete?q=novelist',
+        None,
+        3,
+    ),
+    'GET /book/autocomplete': ('get', '/book/autocomplete?q=book', None, 3),
+    'GET /novelist/': ('get', '/novelist/?limit={size}', None, 3),
+    'GET /novelist/{id}': ('get', '/novelist/{novelist_id}', None, 3),
+    'GET /novelist/changes': ('get', '/novelist/changes', None, 4),
+    'GET /book/': ('get', '/book/?limit={size}', None, 2),
+    'GET /book/changes': ('get', '/book/changes', None, 4),
+    'POST /book/': (
+        'post',
+        '/book/',
+        {'year': 2000, 'title': 'new book', 'novelist_id': '{novelist_id}'},
+        7,
+    ),
+    'PATCH /book/{id}': (
+        'patch',
+        '/book/{book_id}',
+        {'novelist_id': '{other_novelist_id}'},
+        7,
+    ),
+    'DELETE /book/{id}': ('delete', '/book/{book_id}', None, 6),
+    'PATCH /novelist/{id}': (
+        'patch',
+        '/novelist/{novelist_id}',
+        {'name': 'renamed'},
+        6,
+    ),
+    'DELETE /novelist/{id}': ('delete', '/novelist/{novelist_id}', None, 8),
+}
+
+
+# Routes authenticated with a refresh token rather than an access token.
+REFRESH_ROUTES = {'POST /auth/refresh_token/', 'POST /auth/logout/'}
+
+
+def _clear_caches():
+    for cache in [revocations, verified_tokens, *indexes.values()]:
+        cache.clear()
+
+
+@pytest.fixture
+def fresh_catalog(engine, session, monkeypatch):
+    """
+    Returns a function that empties the database and the process-wide
+    caches, then adds the test account, so every size starts from the
+    same cold state whatever ran before.
+    """
+
+    def reset() -> Account:
+        session.close()
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+        _clear_caches()
+        limiter = build_login_rate_limiter()
+        monkeypatch.setattr(
+            ratelimit, 'get_login_rate_limiter', lambda: limiter
+        )
+
+        account = Account(
+            username='tester',
+            email='tester@example.com',
+            password=PASSWORD_HASH,
+        )
+        session.add(account)
+        session.commit()
+        return account
+
+    yield reset
+    _clear_caches()
+
+
+def _fill(template, values):
+    if isinstance(template, dict):
+        return type(template)(
+            (key, _fill(value, values)) for key, value in template.items()
+        )
+    if isinstance(template, list):
+        return [_fill(value, values) for value in template]
+    if not isinstance(template, str):
+        return template
+    if template.startswith('{') and template.endswith('}'):
+        return values[template[1:-1]]
+    return template.format(**values)
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_route_stays_within_query_budget(
+    route, client, fresh_catalog, seed, query_counter
+):
+    method, path, body, budget = ROUTES[route]
+    counts = {}
+    QUERY_REPORT[route] = {'budget': budget, 'counts': counts}
+
+    for size in SIZES:
+        account = fresh_catalog()
+        novelists = seed(max(size, 2))
+        values = {
+            'size': size,
+            'account_id': account.id,
+            'email': account.email,
+            'novelist_id': novelists[0].id,
+            'other_novelist_id': novelists[1].id,
+            'book_id': novelists[0].books[0].id,
+            'other_book_id': novelists[1].books[0].id,
+        }
+        if route in REFRESH_ROUTES:
+            token = create_refresh_token(account.email)
+        else:
+            token = create_access_token({'sub': account.email})
+        request_body = _fill(body, values)
+        form = isinstance(request_body, Form)
+
+        with query_counter:
+            response = client.request(
+                method,
+                _fill(path, values),
+                json=None if form else request_body,
+                data=request_body if form else None,
+                headers={'Authorization': f'Bearer {token}'},
+            )
+
+        assert response.status_code in {HTTPStatus.OK, HTTPStatus.CREATED}
+        counts[size] = query_counter.count
+        assert query_counter.count <= budget, '\n'.join(
+            query_counter.statements
+        )
+
+    assert len(set(counts.values())) == 1, (
+        f'statement count grows with result size: {counts}'
+    )
@@ -0,0 +1,110 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from madrproject.auth import ratelimit
+from madrproject.auth.ratelimit import (
+    BucketLimit,
+    LoginRateLimiter,
+    MemoryBackend,
+    SQLiteBackend,
+    build_login_rate_limiter,
+)
+from madrproject.config.settings import settings
+
+# Two attempts, then one more every 30 seconds.
+LIMIT = BucketLimit(capacity=2, per_second=1 / 30)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'buckets.sqlite3'))
+    return MemoryBackend()
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = LoginRateLimiter(
+        MemoryBackend(),
+        client_limit=BucketLimit(capacity=10, per_second=1),
+        email_limit=LIMIT,
+    )
+    monkeypatch.setattr(ratelimit, 'get_login_rate_limiter', lambda: limiter)
+    return limiter
+
+
+def login(client, email='reader@example.com'):
+    return client.post(
+        '/auth/token/', data={'username': email, 'password': 'wrong'}
+    )
+
+
+def test_exhausted_bucket_is_rejected_with_retry_after(client, limiter):
+    statuses = [login(client).status_code for _ in range(2)]
+    response = login(client)
+
+    assert HTTPStatus.TOO_MANY_REQUESTS not in statuses
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.headers['Retry-After'] == '30'
+    assert login(client, 'other@example.com').status_code != (
+        HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+def test_bucket_refills_over_time(backend, clock):
+    assert [backend.consume('key', LIMIT) for _ in range(2)] == [0, 0]
+    assert backend.consume('key', LIMIT) == pytest.approx(30)
+
+    clock[0] += 15
+    assert backend.consume('key', LIMIT) == pytest.approx(15)
+
+    clock[0] += 15
+    assert backend.consume('key', LIMIT) == 0
+
+
+def test_idle_buckets_are_pruned(backend, clock):
+    backend.consume('idle', LIMIT)
+    clock[0] += 60
+    backend.consume('active', LIMIT)
+    backend.consume('active', LIMIT)
+
+    assert backend.prune(idle_seconds=60) == 1
+    # A pruned bucket starts full, exactly as it would have refilled.
+    assert backend.consume('idle', LIMIT) == 0
+    assert backend.consume('active', LIMIT) > 0
+
+
+def test_limiter_prunes_after_the_slowest_refill(limiter, clock):
+    limiter.check('10.0.0.1', 'reader@example.com')
+
+    clock[0] += 59
+    assert limiter.prune() == 0
+
+    clock[0] += 1
+    assert limiter.prune() == 2  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ('workers', 'backend_class'),
+    [(None, MemoryBackend), (1, MemoryBackend), (4, SQLiteBackend)],
+)
+def test_several_workers_share_their_buckets(
+    monkeypatch, tmp_path, workers, backend_class
+):
+    monkeypatch.setattr(settings, 'LOGIN_RATE_LIMIT_BACKEND', None)
+    monkeypatch.setattr(settings, 'WEB_WORKERS', workers)
+    monkeypatch.setattr(
+        settings, 'LOGIN_RATE_LIMIT_STORE', str(tmp_path / 'buckets.sqlite3')
+    )
+
+    assert isinstance(build_login_rate_limiter().backend, backend_class)
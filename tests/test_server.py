@@ -0,0 +1,148 @@
+import os
+import signal
+import time
+
+import pytest
+
+from madrproject import server
+from madrproject.server import (
+    STARTUP_FAILURE,
+    WORKER_FAILURE,
+    Master,
+    bind_socket,
+    run_worker,
+)
+
+SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+
+
+@pytest.fixture(autouse=True)
+def restore_signals():
+    handlers = {signum: signal.getsignal(signum) for signum in SIGNALS}
+    yield
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+@pytest.fixture
+def sock():
+    sock = bind_socket('127.0.0.1', 0)
+    yield sock
+    sock.close()
+
+
+@pytest.fixture
+def spawned(monkeypatch):
+    """
+    Counts the workers forked; a forked worker sees its own number.
+    """
+    count = []
+    spawn = Master.spawn
+
+    def counting_spawn(self):
+        count.append(len(count) + 1)
+        return spawn(self)
+
+    monkeypatch.setattr(Master, 'spawn', counting_spawn)
+    return count
+
+
+def serve_until_stopped():
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    while True:
+        signal.pause()
+
+
+def wait_for_exit(pid):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        # Leave the worker for the master to reap.
+        if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT):
+            return
+        time.sleep(0.01)
+    pytest.fail(f'worker {pid} did not exit')
+
+
+@pytest.mark.parametrize(
+    ('status', 'stopping'),
+    [(WORKER_FAILURE, False), (STARTUP_FAILURE, True)],
+)
+def test_only_startup_failures_stop_the_master(
+    monkeypatch, sock, status, stopping
+):
+    monkeypatch.setattr(server, 'run_worker', lambda sock: status)
+    master = Master(sock, workers=1)
+
+    pid = master.spawn()
+    wait_for_exit(pid)
+    master.reap()
+
+    assert master.pids == set()
+    assert master.stopping is stopping
+    assert master.failed is stopping
+
+
+def test_crashed_worker_is_replaced(monkeypatch, sock, spawned):
+    def worker(sock):
+        if spawned[-1] == 1:
+            raise RuntimeError('crashed while serving')
+        # The replacement asks the master to shut down.
+        os.kill(os.getppid(), signal.SIGTERM)
+        serve_until_stopped()
+
+    monkeypatch.setattr(server, 'run_worker', worker)
+    master = Master(sock, workers=1)
+
+    assert master.run() == 0
+    assert len(spawned) == 2  # noqa: PLR2004
+    assert master.pids == set()
+
+
+def test_startup_failure_shuts_the_master_down(monkeypatch, sock, spawned):
+    monkeypatch.setattr(server, 'run_worker', lambda sock: STARTUP_FAILURE)
+    master = Master(sock, workers=1)
+
+    assert master.run() == STARTUP_FAILURE
+    assert spawned == [1]
+    assert master.pids == set()
+
+
+def test_shutdown_drains_every_worker(monkeypatch, sock, spawned):
+    workers = 3
+
+    def worker(sock):
+        if spawned[-1] == workers:
+            os.kill(os.getppid(), signal.SIGTERM)
+        serve_until_stopped()
+
+    monkeypatch.setattr(server, 'run_worker', worker)
+    master = Master(sock, workers=workers)
+
+    assert master.run() == 0
+    assert len(spawned) == workers
+    assert master.pids == set()
+
+
+class CrashingServer:
+    def __init__(self, config, started):
+        self.started = started
+
+    def run(self, sockets):
+        self.sockets = sockets
+        raise RuntimeError('crashed')
+
+
+@pytest.mark.parametrize(
+    ('started', 'expected'),
+    [(True, WORKER_FAILURE), (False, STARTUP_FAILURE)],
+)
+def test_worker_status_depends_on_whether_it_started(
+    monkeypatch, sock, started, expected
+):
+    monkeypatch.setattr(
+        server.uvicorn,
+        'Server',
+        lambda config: CrashingServer(config, started),
+    )
+
+    assert run_worker(sock) == expected
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+
+from madrproject import Novelist
+from madrproject.config.database import (
+    RoutingSession,
+    create_writer_engine,
+    metadata,
+    pool_options,
+)
+from madrproject.config.settings import settings
+from madrproject.config.sqlite import install_sqlite_profile, is_sqlite_file
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f'sqlite:///{tmp_path / "catalog.db"}'
+
+
+@pytest.fixture
+def engines(database_url):
+    reader = create_engine(database_url, **pool_options(database_url))
+    writer = create_writer_engine(database_url)
+    for engine in (reader, writer):
+        install_sqlite_profile(engine)
+    metadata.create_all(writer)
+
+    yield reader, writer
+
+    reader.dispose()
+    writer.dispose()
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+
+@pytest.mark.parametrize(
+    ('url', 'expected'),
+    [
+        ('sqlite:///catalog.db', True),
+        ('sqlite://', False),
+        ('sqlite:///:memory:', False),
+        ('postgresql://localhost/catalog', False),
+    ],
+)
+def test_is_sqlite_file(url, expected):
+    assert is_sqlite_file(url) is expected
+
+
+def test_file_database_is_tuned(engines):
+    reader, _ = engines
+
+    assert pragma(reader, 'journal_mode') == 'wal'
+    assert pragma(reader, 'synchronous') == 1  # NORMAL
+    assert pragma(reader, 'busy_timeout') == settings.SQLITE_BUSY_TIMEOUT_MS
+    assert pragma(reader, 'cache_size') == -settings.SQLITE_CACHE_SIZE_KIB
+
+
+def test_in_memory_database_keeps_its_journal():
+    engine = create_engine('sqlite://')
+    install_sqlite_profile(engine)
+
+    assert pragma(engine, 'journal_mode') == 'memory'
+    assert pragma(engine, 'busy_timeout') == settings.SQLITE_BUSY_TIMEOUT_MS
+
+
+def test_writer_engine_is_only_for_sqlite_files(database_url):
+    assert create_writer_engine('sqlite://') is None
+    assert create_writer_engine('postgresql://localhost/catalog') is None
+
+    writer = create_writer_engine(database_url)
+    assert writer.pool.size() == 1
+
+
+def test_session_routes_writes_to_the_writer(engines):
+    reader, writer = engines
+    used = []
+    event.listen(
+        reader, 'before_cursor_execute', lambda *args: used.append('reader')
+    )
+    event.listen(
+        writer, 'before_cursor_execute', lambda *args: used.append('writer')
+    )
+
+    with RoutingSession(reader, writer) as session:
+        session.scalar(select(Novelist))
+        assert used == ['reader']
+
+        session.add(Novelist(name='novelist'))
+        session.flush()
+        session.scalar(select(Novelist))
+        # Drawing the change sequence number, the INSERT, then the read.
+        assert used[1:] == ['writer', 'writer', 'writer']
+
+        session.commit()
+        used.clear()
+        assert session.scalar(select(Novelist.name)) == 'novelist'
+        assert used == ['reader']
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from madrproject.config.statements import HOT_STATEMENTS
+
+
+@pytest.fixture
+def contexts(engine):
+    """
+    Collects the execution context of every statement sent to the
+    database, which records whether the compiled form came from cache.
+    """
+    collected = []
+
+    def on_execute(conn, cursor, statement, *args):
+        collected.append(args[1])
+
+    event.listen(engine, 'before_cursor_execute', on_execute)
+    yield collected
+    event.remove(engine, 'before_cursor_execute', on_execute)
+
+
+@pytest.mark.parametrize('name', sorted(HOT_STATEMENTS))
+def test_hot_statement_is_compiled_once(engine, session, contexts, name):
+    statement, params = HOT_STATEMENTS[name]
+
+    session.execute(statement, params).all()
+    cache_size = len(engine._compiled_cache)
+
+    for _ in range(3):
+        session.execute(statement, params).all()
+
+    first, *repeated = contexts
+    assert all(context.cache_hit == CACHE_HIT for context in repeated)
+    assert all(context.compiled is first.compiled for context in repeated)
+    assert len(engine._compiled_cache) == cache_size
+
+
+def test_lookup_with_new_value_reuses_compiled_form(session, contexts, seed):
+    statement, _ = HOT_STATEMENTS['book_by_title']
+    seed(2)
+    contexts.clear()
+
+    session.execute(statement, {'title': 'book 0-0'}).all()
+    book = session.scalar(statement, {'title': 'book 1-1'})
+
+    assert book.title == 'book 1-1'
+    assert contexts[1].cache_hit == CACHE_HIT
+    assert contexts[1].compiled is contexts[0].compiled
@@ -0,0 +1,158 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from madrproject.config.metrics import metrics
+from madrproject.config.timeouts import (
+    install_statement_timeouts,
+    is_statement_timeout,
+    operational_error_handler,
+    pool_timeout_handler,
+    set_statement_timeout,
+)
+
+SLOW_QUERY = text(
+    'WITH RECURSIVE c(x) AS '
+    '(SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 50000000) '
+    'SELECT count(*) FROM c'
+)
+
+
+@pytest.fixture
+def limited_engine(engine):
+    install_statement_timeouts(engine)
+    return engine
+
+
+def test_slow_statement_is_interrupted(limited_engine):
+    with Session(limited_engine) as session:
+        set_statement_timeout(session, 50)
+
+        with pytest.raises(OperationalError) as error:
+            session.execute(SLOW_QUERY)
+
+        assert is_statement_timeout(error.value)
+
+        session.rollback()
+        assert session.scalar(text('SELECT 1')) == 1
+
+
+def test_timeout_does_not_leak_to_next_checkout(limited_engine):
+    with Session(limited_engine) as session:
+        set_statement_timeout(session, 50)
+        session.scalar(text('SELECT 1'))
+
+    with Session(limited_engine) as session:
+        session.scalar(text('SELECT 1'))
+        connection = session.connection()
+        assert 'statement_timeout_ms' not in connection.info
+
+
+def test_timeout_is_answered_with_503(limited_engine):
+    app = FastAPI()
+    app.add_exception_handler(OperationalError, operational_error_handler)
+
+    @app.get('/slow/')
+    def slow(request: Request):
+        with Session(limited_engine) as session:
+            set_statement_timeout(session, 50)
+            session.execute(SLOW_QUERY)
+
+    with TestClient(app) as client:
+        response = client.get('/slow/')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+    assert {'labels': {'route': 'GET /slow/'}, 'value': 1} in (
+        metrics.snapshot()['statement_timeouts_total']
+    )
+
+
+def database_error(message, connection_invalidated=False):
+    return OperationalError(
+        'SELECT 1',
+        {},
+        sqlite3.OperationalError(message),
+        connection_invalidated=connection_invalidated,
+    )
+
+
+@pytest.fixture
+def failing_client():
+    app = FastAPI()
+    app.add_exception_handler(OperationalError, operational_error_handler)
+    errors = []
+
+    @app.get('/broken/')
+    def broken(request: Request):
+        raise errors[0]
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        yield client, errors
+
+
+@pytest.mark.parametrize(
+    'error',
+    [
+        database_error('database is locked'),
+        database_error('server closed the connection', True),
+    ],
+    ids=['locked', 'connection-lost'],
+)
+def test_unavailable_database_is_answered_with_503(failing_client, error):
+    client, errors = failing_client
+    errors.append(error)
+
+    response = client.get('/broken/')
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {
+        'detail': 'The database is unavailable, try again later.'
+    }
+    assert response.headers['Retry-After'] == '1'
+
+
+@pytest.mark.parametrize(
+    'message', ['no such table: missing', 'near "SELEC": syntax error']
+)
+def test_deterministic_database_errors_stay_500(failing_client, message):
+    client, errors = failing_client
+    errors.append(database_error(message))
+
+    response = client.get('/broken/')
+
+    assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert 'Retry-After' not in response.headers
+
+
+def test_pool_timeout_is_answered_with_503(tmp_path):
+    writer = create_engine(
+        f'sqlite:///{tmp_path / "db.sqlite3"}',
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    app = FastAPI()
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+    @app.get('/write/')
+    def write(request: Request):
+        with Session(writer) as session:
+            session.execute(text('SELECT 1'))
+
+    with writer.connect(), TestClient(app) as client:
+        response = client.get('/write/')
+    writer.dispose()
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+    assert {'labels': {'route': 'GET /write/'}, 'value': 1} in (
+        metrics.snapshot()['pool_timeouts_total']
+    )
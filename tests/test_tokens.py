@@ -0,0 +1,109 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from madrproject.auth.models import RevokedToken
+from madrproject.auth.revocation import purge_revoked_tokens, revocations
+from madrproject.config.database import utcnow
+from madrproject.config.security import (
+    create_refresh_token,
+    get_password_hash,
+    pwd_context,
+    verified_tokens,
+)
+from tests.conftest import bearer
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    revocations.clear()
+    verified_tokens.clear()
+    yield
+    revocations.clear()
+    verified_tokens.clear()
+
+
+@pytest.fixture
+def refresh_token(account):
+    return create_refresh_token(account.email)
+
+
+def test_login_returns_refresh_token(client, session, account):
+    account.password = get_password_hash('secret')
+    session.commit()
+
+    response = client.post(
+        '/auth/token/',
+        data={'username': account.email, 'password': 'secret'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['refresh_token']
+
+
+def test_refresh_rotates_without_hashing(client, refresh_token, monkeypatch):
+    def fail(*args):
+        raise AssertionError('the password hasher must not run')
+
+    monkeypatch.setattr(pwd_context, 'verify', fail)
+    monkeypatch.setattr(pwd_context, 'hash', fail)
+
+    response = client.post(
+        '/auth/refresh_token/', headers=bearer(refresh_token)
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    tokens = response.json()
+    assert tokens['refresh_token'] != refresh_token
+    assert (
+        client.get(
+            '/book/', headers=bearer(tokens['access_token'])
+        ).status_code
+        == HTTPStatus.OK
+    )
+
+
+def test_refresh_token_is_single_use(client, refresh_token):
+    client.post('/auth/refresh_token/', headers=bearer(refresh_token))
+
+    response = client.post(
+        '/auth/refresh_token/', headers=bearer(refresh_token)
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_revocation_survives_restart(client, session, refresh_token):
+    client.post('/auth/logout/', headers=bearer(refresh_token))
+    revocations.clear()
+
+    response = client.post(
+        '/auth/refresh_token/', headers=bearer(refresh_token)
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_refresh_token_is_not_an_access_token(client, refresh_token):
+    response = client.get('/book/', headers=bearer(refresh_token))
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_access_token_verification_is_cached(client, token):
+    client.get('/book/', headers=bearer(token))
+
+    assert verified_tokens.get(token) == 'tester@example.com'
+
+
+def test_expired_revocations_are_purged(engine, session):
+    session.add_all([
+        RevokedToken(jti='expired', expires_at=utcnow() - timedelta(days=1)),
+        RevokedToken(jti='current', expires_at=utcnow() + timedelta(days=1)),
+    ])
+    session.commit()
+
+    assert purge_revoked_tokens(engine) == 1
+    assert session.scalars(select(RevokedToken.jti)).all() == ['current']